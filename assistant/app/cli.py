@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+import csv
+import gzip
 import json
+import os
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional, TextIO
 
 import typer
-from sqlmodel import Session, select
+from pydantic import ValidationError
+from sqlmodel import Session, SQLModel, select
 
 from .deps import engine, init_db
 from .models import Note, NoteCreate, Task, TaskCreate
@@ -64,19 +68,160 @@ def task(
     typer.echo(f"Task saved with id={task.id}")
 
 
+EXPORT_BATCH_SIZE = 1000
+IMPORT_MODELS: dict[str, tuple[type[SQLModel], type[SQLModel]]] = {
+    "note": (Note, NoteCreate),
+    "task": (Task, TaskCreate),
+}
+
+
+def _open_text(path: Path, mode: str, compress: bool = False) -> TextIO:
+    if compress or path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return path.open(mode, encoding="utf-8", newline="" if path.suffix == ".csv" else None)
+
+
+def _stream_rows(session: Session, model: type[SQLModel], since: Optional[datetime]) -> Iterator[dict]:
+    """Yield table rows as dicts from a server-side cursor, ``EXPORT_BATCH_SIZE`` at a time."""
+    table = model.__table__
+    statement = select(table).order_by(table.c.id)
+    if since:
+        statement = statement.where(table.c.updated_at >= since)
+    result = session.connection().execution_options(yield_per=EXPORT_BATCH_SIZE).execute(statement)
+    for row in result.mappings():
+        yield dict(row)
+
+
 @app.command()
-def export(out: Path = typer.Argument(Path("assistant_export.json"))) -> None:
-    """Dump all notes and tasks to JSON."""
+def export(
+    out: Path = typer.Argument(Path("assistant_export.json")),
+    format: str = typer.Option("json", "--format", "-f", help="json or jsonl"),
+    compress: bool = typer.Option(False, "--gzip", help="Gzip the output (implied by a .gz suffix)"),
+    since: Optional[datetime] = typer.Option(None, "--since", help="Only items created or changed at or after this time"),
+) -> None:
+    """Stream notes and tasks to JSON or JSONL without loading them into memory."""
+    if format not in {"json", "jsonl"}:
+        raise typer.BadParameter("format must be json or jsonl", param_hint="--format")
     init_db()
-    with Session(engine) as session:
-        notes = session.exec(select(Note)).all()
-        tasks = session.exec(select(Task)).all()
-        data = {
-            "notes": [note.dict() for note in notes],
-            "tasks": [task.dict() for task in tasks],
-        }
-        out.write_text(json.dumps(data, default=str, indent=2))
-        typer.echo(f"Exported to {out}")
+    counts = {"note": 0, "task": 0}
+    with Session(engine) as session, _open_text(out, "w", compress) as handle:
+        if format == "json":
+            handle.write("{")
+        for position, (kind, model) in enumerate((("note", Note), ("task", Task))):
+            if format == "json":
+                handle.write(f'{"," if position else ""}\n  "{kind}s": [')
+            for row in _stream_rows(session, model, since):
+                if format == "jsonl":
+                    handle.write(json.dumps({"type": kind, **row}, default=str) + "\n")
+                else:
+                    handle.write(("," if counts[kind] else "") + "\n    " + json.dumps(row, default=str))
+                counts[kind] += 1
+            if format == "json":
+                handle.write("\n  ]")
+        if format == "json":
+            handle.write("\n}\n")
+    typer.echo(f"Exported {counts['note']} notes and {counts['task']} tasks to {out}")
+
+
+def _read_records(path: Path) -> Iterator[tuple[int, dict | None, str | None]]:
+    """Yield ``(line, record, error)`` from JSONL, a JSON export or CSV (optionally gzipped).
+
+    Lines that cannot be parsed into an object come back with ``record`` None and
+    the reason in ``error``, so the caller can report them and carry on.
+    """
+    name = path.name[:-3] if path.name.endswith(".gz") else path.name
+    with _open_text(path, "r") as handle:
+        if name.endswith(".csv"):
+            for line, row in enumerate(csv.DictReader(handle), start=2):
+                # Empty cells are left out so model defaults (e.g. created_at) apply.
+                yield line, {key: value for key, value in row.items() if value not in ("", None)}, None
+        elif name.endswith(".json"):
+            # The export format; json.load is not streaming, prefer JSONL for large dumps.
+            data = json.load(handle)
+            for kind in IMPORT_MODELS:
+                for position, record in enumerate(data.get(f"{kind}s", []), start=1):
+                    if isinstance(record, dict):
+                        yield position, {"type": kind, **record}, None
+                    else:
+                        yield position, None, f"expected an object, got {type(record).__name__}"
+        else:
+            for line, text in enumerate(handle, start=1):
+                if not text.strip():
+                    continue
+                try:
+                    record = json.loads(text)
+                except ValueError as exc:
+                    yield line, None, f"invalid JSON: {exc}"
+                    continue
+                if isinstance(record, dict):
+                    yield line, record, None
+                else:
+                    yield line, None, f"expected an object, got {type(record).__name__}"
+
+
+@app.command("import")
+def import_(
+    source: Path = typer.Argument(..., exists=True, dir_okay=False),
+    kind: Optional[str] = typer.Option(None, "--kind", "-k", help="note or task, when records carry no 'type'"),
+    batch_size: int = typer.Option(500, "--batch-size", min=1),
+) -> None:
+    """Import notes and tasks from JSONL or CSV in batched transactions."""
+    if kind and kind not in IMPORT_MODELS:
+        raise typer.BadParameter("kind must be note or task", param_hint="--kind")
+    init_db()
+    imported = {name: 0 for name in IMPORT_MODELS}
+    errors = 0
+    pending: list[SQLModel] = []
+
+    def flush() -> None:
+        with Session(engine) as session:
+            session.add_all(pending)
+            session.commit()
+        pending.clear()
+
+    for line, record, error in _read_records(source):
+        if record is None:
+            typer.echo(f"{source}:{line}: {error}", err=True)
+            errors += 1
+            continue
+        record_kind = record.pop("type", None) or kind
+        record.pop("id", None)
+        if record_kind not in IMPORT_MODELS:
+            typer.echo(f"{source}:{line}: unknown record type {record_kind!r}", err=True)
+            errors += 1
+            continue
+        model, create = IMPORT_MODELS[record_kind]
+        try:
+            pending.append(model.from_orm(create.model_validate(record)))
+        except ValidationError as exc:
+            typer.echo(f"{source}:{line}: {exc.errors()[0]['msg']}", err=True)
+            errors += 1
+            continue
+        imported[record_kind] += 1
+        if len(pending) >= batch_size:
+            flush()
+    if pending:
+        flush()
+    typer.echo(f"Imported {imported['note']} notes and {imported['task']} tasks ({errors} skipped)")
+
+
+@app.command()
+def serve(
+    host: str = typer.Option("127.0.0.1", "--host"),
+    port: int = typer.Option(8000, "--port"),
+    rag: bool = typer.Option(True, "--rag/--no-rag", help="Serve /ask and index the vault; off to skip the RAG stack"),
+    reload: bool = typer.Option(False, "--reload"),
+) -> None:
+    """Run the API server in a single process.
+
+    There is deliberately no ``--workers``: the scheduler, reminder sweeper and
+    indexers run inside the server and must not be duplicated across processes.
+    """
+    import uvicorn
+
+    # Read when the app is imported, also by uvicorn's reload process.
+    os.environ["RAG_ENABLED"] = "true" if rag else "false"
+    uvicorn.run("assistant.app.main:app", host=host, port=port, reload=reload)
 
 
 if __name__ == "__main__":
@@ -1,24 +1,132 @@
 from __future__ import annotations
 
+import logging
 import os
 from functools import lru_cache
 
+from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from apscheduler.schedulers.background import BackgroundScheduler
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Engine
 from sqlmodel import Session, SQLModel, create_engine
 
+logger = logging.getLogger(__name__)
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./assistant.db")
-engine = create_engine(DATABASE_URL, echo=False, connect_args={"check_same_thread": False})
+# "production" applies the SQLite pragmas below on every connection; "default" leaves SQLite untouched.
+STORAGE_PROFILE = os.getenv("STORAGE_PROFILE", "production")
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT", "5000"),
+    "mmap_size": os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)),
+    "cache_size": os.getenv("SQLITE_CACHE_SIZE", "-65536"),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+}
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_MAINTENANCE_INTERVAL = int(os.getenv("DB_MAINTENANCE_INTERVAL", "3600"))
+# Reminders that fell due while the process was down are still delivered (once)
+# if they are at most this many seconds late.
+SCHEDULER_MISFIRE_GRACE = int(os.getenv("SCHEDULER_MISFIRE_GRACE", "3600"))
+
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def _apply_sqlite_pragmas(dbapi_connection, _connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            if value:
+                cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def build_engine(url: str = DATABASE_URL) -> Engine:
+    if not _is_sqlite(url):
+        # Server databases (e.g. postgresql+psycopg://) get a sized, self-healing pool.
+        return create_engine(
+            url,
+            echo=False,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=True,
+        )
+    kwargs: dict[str, object] = {}
+    if ":memory:" not in url and url not in {"sqlite://", "sqlite:///"}:
+        kwargs.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+    sqlite_engine = create_engine(url, echo=False, connect_args={"check_same_thread": False}, **kwargs)
+    if STORAGE_PROFILE == "production":
+        event.listen(sqlite_engine, "connect", _apply_sqlite_pragmas)
+    return sqlite_engine
+
+
+engine = build_engine()
+# Longest a commit can wait for SQLite's write lock after its rows were stamped.
+WRITE_LOCK_WAIT_SECONDS = (
+    float(SQLITE_PRAGMAS["busy_timeout"] or 0) / 1000
+    if _is_sqlite(DATABASE_URL) and STORAGE_PROFILE == "production"
+    else 0.0
+)
 
 
 @lru_cache
 def get_scheduler() -> BackgroundScheduler:
-    scheduler = BackgroundScheduler()
+    # "default" persists jobs that cannot be rebuilt from the database (note pings);
+    # "memory" holds task reminders and housekeeping, which are rehydrated from
+    # the Task table on every start.
+    scheduler = BackgroundScheduler(
+        jobstores={
+            "default": SQLAlchemyJobStore(engine=engine, tablename="apscheduler_jobs"),
+            "memory": MemoryJobStore(),
+        },
+        job_defaults={"coalesce": True, "misfire_grace_time": SCHEDULER_MISFIRE_GRACE, "max_instances": 1},
+    )
     return scheduler
 
 
 def init_db() -> None:
     SQLModel.metadata.create_all(engine)
+    # create_all skips tables that already exist; add nullable columns and
+    # indexes introduced since.
+    existing = inspect(engine)
+    with engine.begin() as connection:
+        for table in SQLModel.metadata.sorted_tables:
+            if not existing.has_table(table.name):
+                continue
+            present = {column["name"] for column in existing.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in present or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'))
+                source = column.info.get("backfill_from")
+                if source:
+                    connection.execute(text(f'UPDATE "{table.name}" SET "{column.name}" = "{source}"'))
+                logger.info("Added column %s.%s", table.name, column.name)
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+
+def optimize_storage() -> None:
+    """Periodic SQLite upkeep: refresh planner statistics and checkpoint the WAL."""
+    if not _is_sqlite(str(engine.url)):
+        return
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("PRAGMA optimize"))
+            connection.execute(text("PRAGMA wal_checkpoint(PASSIVE)"))
+    except Exception:
+        logger.exception("SQLite maintenance failed")
 
 
 def get_session() -> Session:
@@ -1,39 +1,164 @@
 from __future__ import annotations
 
 import logging
+import threading
+import time
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
 
-from .deps import get_scheduler, init_db
-from .routers import ask, briefing, notes, tasks
+from .deps import DB_MAINTENANCE_INTERVAL, engine, get_scheduler, init_db, optimize_storage
+from .routers import ask, briefing, notes, sync, tasks
+from .services.indexer import get_vault_indexer
+from .services.llm import get_llm_service
+from .services.metrics import (
+    HTTP_SECONDS,
+    METRICS_ENABLED,
+    REGISTRY,
+    instrument_engine,
+    instrument_scheduler,
+    log_if_slow,
+    register_gauge,
+    start_request,
+)
+from .services.note_indexer import get_note_indexer
+from .services.notifications import get_notification_dispatcher
+from .services.rag import RAG_ENABLED, get_rag_service
+from .services.scheduler import SchedulerService
+from .services.sync import check_settle_window, prune_tombstones
 
 logger = logging.getLogger("assistant.app")
+# How long shutdown waits for an unfinished RAG warm-up, like the indexers' stop().
+WARMUP_JOIN_TIMEOUT = 5.0
+
+
+def _warm_up_rag() -> None:
+    try:
+        get_rag_service()
+    except Exception:
+        logger.exception("RAG warm-up failed; it will be retried on first use")
 
 
 @asynccontextmanager
-def lifespan(app: FastAPI):
+async def lifespan(app: FastAPI):
+    check_settle_window()
     init_db()
     scheduler = get_scheduler()
+    instrument_scheduler(scheduler)
     if not scheduler.running:
+        # Reminders are queued before start so the scheduler adds them in one pass.
+        SchedulerService(scheduler).rehydrate()
         scheduler.start()
         logger.info("Scheduler started")
+    scheduler.add_job(
+        optimize_storage,
+        "interval",
+        seconds=DB_MAINTENANCE_INTERVAL,
+        id="db-maintenance",
+        jobstore="memory",
+        replace_existing=True,
+    )
+    scheduler.add_job(
+        prune_tombstones,
+        "interval",
+        hours=24,
+        id="tombstone-prune",
+        jobstore="memory",
+        replace_existing=True,
+    )
+    # One RAG engine per process. Loading it takes seconds, so it is warmed up in
+    # the background while the server already answers requests; the vault is
+    # indexed and watched off the request path.
+    warmup: threading.Thread | None = None
+    if RAG_ENABLED:
+        warmup = threading.Thread(target=_warm_up_rag, name="rag-warmup", daemon=True)
+        warmup.start()
+        get_vault_indexer().start()
+        get_note_indexer().start()
     try:
         yield
     finally:
+        if warmup is not None:
+            # A daemon thread: a hung Chroma or embedding load must not block shutdown.
+            warmup.join(WARMUP_JOIN_TIMEOUT)
+            if warmup.is_alive():
+                logger.warning("RAG warm-up still running after %.0fs; not waiting for it", WARMUP_JOIN_TIMEOUT)
+        get_note_indexer().stop()
+        get_vault_indexer().stop()
+        if get_llm_service.cache_info().currsize:  # never created: nothing to close
+            await get_llm_service().aclose()
         if scheduler.running:
             scheduler.shutdown(wait=False)
             logger.info("Scheduler shut down")
+        get_notification_dispatcher().stop()
+        optimize_storage()
 
 
 app = FastAPI(title="Personal Assistant", lifespan=lifespan)
+instrument_engine(engine)
+register_gauge(
+    "assistant_notification_queue_depth",
+    "Notifications waiting for delivery.",
+    lambda: get_notification_dispatcher().status()["queued"],
+)
+register_gauge(
+    "assistant_note_index_queue_depth",
+    "Note and task events waiting to be indexed.",
+    lambda: get_note_indexer().status()["queued"],
+)
+register_gauge(
+    "assistant_vault_index_queue_depth",
+    "Vault files waiting to be indexed.",
+    lambda: len(get_vault_indexer().queued),
+)
+
+
+def _route_label(scope: dict) -> str:
+    # "/tasks/{task_id}" rather than "/tasks/42" keeps label cardinality bounded.
+    # Routers carry their own prefix, so the matched route's path is the full template.
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+if METRICS_ENABLED:
 
-app.include_router(notes.router, prefix="/notes", tags=["notes"])
-app.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
-app.include_router(briefing.router, prefix="/briefing", tags=["briefing"])
-app.include_router(ask.router, prefix="/ask", tags=["ask"])
+    @app.middleware("http")
+    async def record_request_metrics(request: Request, call_next):
+        breakdown = start_request()
+        started = time.perf_counter()
+        response = await call_next(request)
+        route = _route_label(request.scope)
+        body = response.body_iterator
+
+        async def timed_body():
+            # Timed until the last chunk is sent, so streamed answers (/ask/stream)
+            # count their full duration rather than the time to the first byte.
+            try:
+                async for chunk in body:
+                    yield chunk
+            finally:
+                elapsed = time.perf_counter() - started
+                HTTP_SECONDS.observe(elapsed, method=request.method, route=route, status=str(response.status_code))
+                log_if_slow(request.method, route, response.status_code, elapsed, breakdown)
+
+        response.body_iterator = timed_body()
+        return response
+
+
+app.include_router(notes.router)
+app.include_router(tasks.router)
+app.include_router(briefing.router)
+if RAG_ENABLED:
+    app.include_router(ask.router)
+app.include_router(sync.router)
 
 
 @app.get("/")
 def healthcheck() -> dict[str, str]:
     return {"status": "ok"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
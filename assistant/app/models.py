@@ -1,10 +1,16 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
-from typing import Optional
+import logging
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Optional
 
+from apscheduler.triggers.cron import CronTrigger
+from sqlalchemy import Index, event, inspect
 from sqlmodel import Field, SQLModel
 
+logger = logging.getLogger(__name__)
+
 
 class NoteBase(SQLModel):
     title: str = Field(index=True)
@@ -14,6 +20,11 @@ class NoteBase(SQLModel):
 
 class Note(NoteBase, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
+    updated_at: Optional[datetime] = Field(
+        default_factory=datetime.utcnow,
+        index=True,
+        sa_column_kwargs={"onupdate": datetime.utcnow, "info": {"backfill_from": "created_at"}},
+    )
 
 
 class NoteCreate(NoteBase):
@@ -36,7 +47,72 @@ class TaskBase(SQLModel):
 
 
 class Task(TaskBase, table=True):
+    __table_args__ = (Index("ix_task_completed_due_date", "completed", "due_date"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
+    # Maintained on every insert/update; drives the reminder sweeper.
+    next_reminder_at: Optional[datetime] = Field(default=None, index=True)
+    updated_at: Optional[datetime] = Field(
+        default_factory=datetime.utcnow,
+        index=True,
+        sa_column_kwargs={"onupdate": datetime.utcnow, "info": {"backfill_from": "created_at"}},
+    )
+
+
+@lru_cache(maxsize=256)
+def parse_recurrence(recurrence: str) -> CronTrigger | None:
+    recurrence = recurrence.strip().lower()
+    presets = {
+        "daily": lambda: CronTrigger(hour=9),
+        "weekly": lambda: CronTrigger(day_of_week="mon", hour=9),
+        "weekdays": lambda: CronTrigger(day_of_week="mon-fri", hour=9),
+    }
+    if recurrence in presets:
+        return presets[recurrence]()
+    try:
+        return CronTrigger.from_crontab(recurrence)
+    except ValueError:
+        logger.warning("Invalid recurrence pattern '%s'", recurrence)
+        return None
+
+
+def next_reminder_at(task: Any, now: datetime) -> datetime | None:
+    """When the task's next reminder is due (naive UTC), mirroring the job planner."""
+    if task.completed:
+        return None
+    if task.due_date:
+        run_time = task.due_date
+        if task.reminder_offset:
+            run_time = run_time - timedelta(minutes=task.reminder_offset)
+        if run_time > now:
+            return run_time
+    trigger = parse_recurrence(task.recurrence) if task.recurrence else None
+    if not trigger:
+        return None
+    # Strictly after ``now`` so a reminder sent at 09:00:00 is not due again.
+    fire_time = trigger.get_next_fire_time(None, (now + timedelta(microseconds=1)).replace(tzinfo=timezone.utc))
+    if fire_time is None:
+        return None
+    return fire_time.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+# Registered here, next to the column, so every ORM writer keeps the reminder
+# sweeper's index current, whatever else it imports.
+_SCHEDULE_FIELDS = ("due_date", "reminder_offset", "recurrence", "completed", "last_reminded_at")
+
+
+@event.listens_for(Task, "before_insert")
+def _task_inserted(_mapper, _connection, task: Task) -> None:
+    task.next_reminder_at = next_reminder_at(task, datetime.utcnow())
+
+
+@event.listens_for(Task, "before_update")
+def _task_updated(_mapper, _connection, task: Task) -> None:
+    state = inspect(task)
+    if state.attrs.next_reminder_at.history.has_changes():
+        return
+    if any(state.attrs[name].history.has_changes() for name in _SCHEDULE_FIELDS):
+        task.next_reminder_at = next_reminder_at(task, datetime.utcnow())
 
 
 class TaskCreate(TaskBase):
@@ -54,6 +130,15 @@ class TaskUpdate(SQLModel):
     last_reminded_at: Optional[datetime] = None
 
 
+class Tombstone(SQLModel, table=True):
+    """Records a deleted note or task so delta-sync clients can drop it."""
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    kind: str
+    item_id: int
+    deleted_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+
 class Reminder(SQLModel):
     task_id: int
     run_at: datetime
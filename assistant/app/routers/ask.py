@@ -1,23 +1,101 @@
 from __future__ import annotations
 
+import json
+from datetime import datetime
+from typing import AsyncIterator, Literal
+
 from pydantic import BaseModel
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+
+from ..services.indexer import VaultIndexer, get_vault_indexer
+from ..services.note_indexer import NoteIndexer, get_note_indexer
+from ..services.metadata import SearchFilter
+from ..services.rag import DEFAULT_SEARCH_MODE, RAGService
 
-from ..services.rag import RAGService
+router = APIRouter(prefix="/ask", tags=["ask"])
 
-router = APIRouter()
+
+class AskFilters(BaseModel):
+    path: str | None = None
+    file_types: list[str] = []
+    modified_after: datetime | None = None
+    modified_before: datetime | None = None
+    tags: list[str] = []
 
 
 class AskRequest(BaseModel):
     question: str
     top_k: int | None = 4
+    mode: Literal["hybrid", "vector", "lexical"] | None = None
+    filters: AskFilters | None = None
+
+
+def _search_filter(payload: AskRequest) -> SearchFilter | None:
+    if payload.filters is None:
+        return None
+    try:
+        return SearchFilter(**payload.filters.model_dump())
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
 @router.post("/", response_model=dict[str, object])
-def ask_question(payload: AskRequest, rag: RAGService = Depends(RAGService.depends)) -> dict[str, object]:
-    answer, sources = rag.query(payload.question, top_k=payload.top_k or 4)
+async def ask_question(payload: AskRequest, rag: RAGService = Depends(RAGService.depends)) -> dict[str, object]:
+    answer, sources = await rag.aquery(
+        payload.question,
+        top_k=payload.top_k or 4,
+        mode=payload.mode or DEFAULT_SEARCH_MODE,
+        filters=_search_filter(payload),
+    )
     return {
         "question": payload.question,
         "answer": answer,
         "sources": sources,
     }
+
+
+def _sse(event: str, data: object) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.post("/stream")
+async def ask_question_stream(
+    payload: AskRequest, rag: RAGService = Depends(RAGService.depends)
+) -> StreamingResponse:
+    """Stream the answer as Server-Sent Events: ``sources``, then ``token`` events, then ``done``."""
+    sources, pieces = await rag.astream_query(
+        payload.question,
+        top_k=payload.top_k or 4,
+        mode=payload.mode or DEFAULT_SEARCH_MODE,
+        filters=_search_filter(payload),
+    )
+
+    async def events() -> AsyncIterator[str]:
+        yield _sse("sources", {"question": payload.question, "sources": sources})
+        try:
+            async for piece in pieces:
+                yield _sse("token", {"text": piece})
+        except Exception as exc:
+            yield _sse("error", {"detail": str(exc)})
+            return
+        yield _sse("done", {})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/index/status", response_model=dict[str, object])
+def index_status(
+    indexer: VaultIndexer = Depends(get_vault_indexer),
+    note_indexer: NoteIndexer = Depends(get_note_indexer),
+) -> dict[str, object]:
+    return {**indexer.status(), "notes": note_indexer.status()}
+
+
+@router.get("/cache/stats", response_model=dict[str, object])
+def cache_stats(rag: RAGService = Depends(RAGService.depends)) -> dict[str, object]:
+    return {**rag.answer_cache.stats(), "embeddings": rag.embedder.stats()}
@@ -1,62 +1,29 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
-
-from fastapi import APIRouter, Depends
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, Request, Response
+from sqlmodel import Session
 
 from ..deps import get_session
-from ..models import Note, Task
-
-router = APIRouter()
-
-
-@router.get("/today")
-def daily_briefing(session: Session = Depends(get_session)) -> dict[str, object]:
-    now = datetime.utcnow()
-    start_of_day = datetime(now.year, now.month, now.day)
-    end_of_day = start_of_day + timedelta(days=1)
-
-    due_today = session.exec(
-        select(Task).where(
-            Task.completed == False,  # noqa: E712
-            Task.due_date.is_not(None),
-            Task.due_date >= start_of_day,
-            Task.due_date < end_of_day,
-        )
-    ).all()
+from ..services.briefing import BriefingCache, get_briefing_cache
 
-    overdue = session.exec(
-        select(Task).where(
-            Task.completed == False,  # noqa: E712
-            Task.due_date.is_not(None),
-            Task.due_date < start_of_day,
-        )
-    ).all()
+router = APIRouter(prefix="/briefing", tags=["briefing"])
 
-    upcoming = session.exec(
-        select(Task)
-        .where(
-            Task.completed == False,  # noqa: E712
-            Task.due_date.is_not(None),
-            Task.due_date >= end_of_day,
-            Task.due_date < end_of_day + timedelta(days=7),
-        )
-        .order_by(Task.due_date)
-    ).all()
 
-    latest_notes = session.exec(select(Note).order_by(Note.created_at.desc()).limit(5)).all()
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
 
-    priorities = sorted(
-        [task for task in due_today + upcoming if task.priority is not None],
-        key=lambda task: task.priority,
-    )
 
-    return {
-        "timestamp": now.isoformat(),
-        "due_today": due_today,
-        "overdue": overdue,
-        "upcoming": upcoming,
-        "latest_notes": latest_notes,
-        "priorities": priorities[:5],
-    }
+@router.get("/today", response_model=None)
+def daily_briefing(
+    request: Request,
+    session: Session = Depends(get_session),
+    cache: BriefingCache = Depends(get_briefing_cache),
+) -> Response:
+    etag, body = cache.get(session)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,18 +1,51 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+from datetime import datetime
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
 
 from ..models import Note, NoteCreate
+from ..services.briefing import invalidate_briefing
+from ..services.note_indexer import NoteIndexer, get_note_indexer
 from ..services.scheduler import SchedulerService
+from ..services.sync import record_deletion
 from ..deps import get_session
+from ..utils.bulk import BULK_MAX_ITEMS, chunked, parse_items, validate_items
+from ..utils.pagination import paginate, parse_fields
+
+router = APIRouter(prefix="/notes", tags=["notes"])
 
-router = APIRouter()
+NOTE_ORDERING = [(Note.created_at, True), (Note.id, True)]
+NOTE_FIELDS = list(Note.__fields__)
 
 
-@router.get("/", response_model=list[Note])
-def list_notes(session: Session = Depends(get_session)) -> list[Note]:
-    notes = session.exec(select(Note).order_by(Note.created_at.desc())).all()
+@router.get("/", response_model=None)
+def list_notes(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    fields: str | None = Query(None, description="Comma-separated fields to return, e.g. id,title,created_at"),
+    created_after: datetime | None = Query(None),
+    created_before: datetime | None = Query(None),
+    session: Session = Depends(get_session),
+) -> list[Any]:
+    """Newest notes first, one keyset page at a time; the next page's cursor is in ``X-Next-Cursor``."""
+    filters = []
+    if created_after:
+        filters.append(Note.created_at >= created_after)
+    if created_before:
+        filters.append(Note.created_at < created_before)
+    try:
+        notes, next_cursor = paginate(
+            session, Note, NOTE_ORDERING, filters, limit, cursor, parse_fields(fields, NOTE_FIELDS)
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return notes
 
 
@@ -21,11 +54,14 @@ def create_note(
     payload: NoteCreate,
     session: Session = Depends(get_session),
     scheduler: SchedulerService = Depends(SchedulerService.depends),
+    indexer: NoteIndexer = Depends(get_note_indexer),
 ) -> Note:
     note = Note.from_orm(payload)
     session.add(note)
     session.commit()
     session.refresh(note)
+    invalidate_briefing()
+    indexer.enqueue_note(note.id)
 
     # Optionally schedule a reminder if recurrence provided through scheduler quick capture
     if payload.title and payload.title.lower().startswith("remind"):
@@ -34,6 +70,56 @@ def create_note(
     return note
 
 
+@router.post("/bulk", response_model=dict[str, object], status_code=201)
+async def create_notes_bulk(
+    request: Request,
+    session: Session = Depends(get_session),
+    scheduler: SchedulerService = Depends(SchedulerService.depends),
+    indexer: NoteIndexer = Depends(get_note_indexer),
+) -> dict[str, object]:
+    """Create many notes from a JSON array or NDJSON body.
+
+    Rows are inserted ``BULK_CHUNK_SIZE`` per transaction; items that fail
+    validation are reported by index in ``errors`` and skipped.
+    """
+    try:
+        items, errors = parse_items(await request.body())
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ITEMS} items per request")
+    valid, invalid = validate_items(items, NoteCreate)
+    ids, failed = await run_in_threadpool(_insert_notes, session, scheduler, valid)
+    for note_id in ids.values():
+        indexer.enqueue_note(note_id)
+    if ids:
+        invalidate_briefing()
+    errors = sorted(errors + invalid + failed, key=lambda error: error["index"])
+    return {"created": len(ids), "ids": [ids[index] for index in sorted(ids)], "errors": errors}
+
+
+def _insert_notes(
+    session: Session, scheduler: SchedulerService, valid: list[tuple[int, NoteCreate]]
+) -> tuple[dict[int, int], list[dict[str, object]]]:
+    ids: dict[int, int] = {}
+    failed: list[dict[str, object]] = []
+    session.expire_on_commit = False
+    for chunk in chunked(valid):
+        notes = [(index, Note.from_orm(payload)) for index, payload in chunk]
+        try:
+            session.add_all([note for _, note in notes])
+            session.commit()
+        except Exception as exc:
+            session.rollback()
+            failed += [{"index": index, "error": exc.__class__.__name__} for index, _ in notes]
+            continue
+        for index, note in notes:
+            ids[index] = note.id
+            if note.title.lower().startswith("remind"):
+                scheduler.schedule_note_ping(note)
+    return ids, failed
+
+
 @router.get("/{note_id}", response_model=Note)
 def get_note(note_id: int, session: Session = Depends(get_session)) -> Note:
     note = session.get(Note, note_id)
@@ -43,12 +129,19 @@ def get_note(note_id: int, session: Session = Depends(get_session)) -> Note:
 
 
 @router.delete("/{note_id}", status_code=204)
-def delete_note(note_id: int, session: Session = Depends(get_session)) -> None:
+def delete_note(
+    note_id: int,
+    session: Session = Depends(get_session),
+    indexer: NoteIndexer = Depends(get_note_indexer),
+) -> None:
     note = session.get(Note, note_id)
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     session.delete(note)
+    record_deletion(session, "note", note_id)
     session.commit()
+    invalidate_briefing()
+    indexer.enqueue_note(note_id)
 
 
 # placeholder dependency injection for scheduler service to avoid circular imports
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import Session
+
+from ..deps import get_session
+from ..services.sync import CursorExpired, changes_since
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+@router.get("/", response_model=dict[str, object])
+def sync(
+    cursor: str | None = Query(None, description="Cursor returned by the previous call; omit for a full sync"),
+    limit: int = Query(500, ge=1, le=5000),
+    session: Session = Depends(get_session),
+) -> dict[str, Any]:
+    """Notes and tasks changed, and ids deleted, since ``cursor``."""
+    try:
+        return changes_since(session, cursor, limit)
+    except CursorExpired as exc:
+        raise HTTPException(status_code=410, detail="Cursor expired; sync again without a cursor") from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
@@ -1,27 +1,59 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
 
 from ..models import Task, TaskCreate, TaskUpdate
 from ..deps import get_session
+from ..services.briefing import invalidate_briefing
+from ..services.note_indexer import NoteIndexer, get_note_indexer
+from ..services.notifications import NotificationDispatcher, get_notification_dispatcher
 from ..services.scheduler import SchedulerService
+from ..services.sync import record_deletion
+from ..utils.bulk import BULK_MAX_ITEMS, chunked, parse_items, validate_items
+from ..utils.pagination import paginate, parse_fields
 
-router = APIRouter()
+router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+TASK_ORDERING = [(Task.completed, False), (Task.due_date, False), (Task.priority, True), (Task.id, False)]
+TASK_FIELDS = list(Task.__fields__)
 
-@router.get("/", response_model=list[Task])
+
+@router.get("/", response_model=None)
 def list_tasks(
+    response: Response,
     include_completed: bool = Query(False, description="Include completed tasks"),
+    completed: bool | None = Query(None, description="Only completed (true) or open (false) tasks"),
+    due_after: datetime | None = Query(None),
+    due_before: datetime | None = Query(None),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    fields: str | None = Query(None, description="Comma-separated fields to return, e.g. id,title,due_date"),
     session: Session = Depends(get_session),
-) -> list[Task]:
-    statement = select(Task)
-    if not include_completed:
-        statement = statement.where(Task.completed == False)  # noqa: E712
-    statement = statement.order_by(Task.completed, Task.due_date, Task.priority.desc())
-    return session.exec(statement).all()
+) -> list[Any]:
+    """Tasks by completion, due date and priority, one keyset page at a time."""
+    filters = []
+    if completed is not None:
+        filters.append(Task.completed == completed)
+    elif not include_completed:
+        filters.append(Task.completed == False)  # noqa: E712
+    if due_after:
+        filters.append(Task.due_date >= due_after)
+    if due_before:
+        filters.append(Task.due_date < due_before)
+    try:
+        tasks, next_cursor = paginate(
+            session, Task, TASK_ORDERING, filters, limit, cursor, parse_fields(fields, TASK_FIELDS)
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return tasks
 
 
 @router.post("/", response_model=Task, status_code=201)
@@ -29,21 +61,74 @@ def create_task(
     payload: TaskCreate,
     session: Session = Depends(get_session),
     scheduler: SchedulerService = Depends(SchedulerService.depends),
+    indexer: NoteIndexer = Depends(get_note_indexer),
 ) -> Task:
     task = Task.from_orm(payload)
     session.add(task)
     session.commit()
     session.refresh(task)
+    invalidate_briefing()
     scheduler.sync_task(task)
+    indexer.enqueue_task(task.id)
     return task
 
 
+@router.post("/bulk", response_model=dict[str, object], status_code=201)
+async def create_tasks_bulk(
+    request: Request,
+    session: Session = Depends(get_session),
+    scheduler: SchedulerService = Depends(SchedulerService.depends),
+    indexer: NoteIndexer = Depends(get_note_indexer),
+) -> dict[str, object]:
+    """Create many tasks from a JSON array or NDJSON body.
+
+    Rows are inserted ``BULK_CHUNK_SIZE`` per transaction and their reminders
+    are scheduled in one pass; invalid items are reported by index in ``errors``.
+    """
+    try:
+        items, errors = parse_items(await request.body())
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ITEMS} items per request")
+    valid, invalid = validate_items(items, TaskCreate)
+    tasks, failed = await run_in_threadpool(_insert_tasks, session, valid)
+    await run_in_threadpool(scheduler.sync_tasks, list(tasks.values()))
+    for task in tasks.values():
+        indexer.enqueue_task(task.id)
+    if tasks:
+        invalidate_briefing()
+    errors = sorted(errors + invalid + failed, key=lambda error: error["index"])
+    return {"created": len(tasks), "ids": [tasks[index].id for index in sorted(tasks)], "errors": errors}
+
+
+def _insert_tasks(
+    session: Session, valid: list[tuple[int, TaskCreate]]
+) -> tuple[dict[int, Task], list[dict[str, object]]]:
+    created: dict[int, Task] = {}
+    failed: list[dict[str, object]] = []
+    # Keep attributes loaded after commit so scheduling needs no per-row refresh.
+    session.expire_on_commit = False
+    for chunk in chunked(valid):
+        tasks = [(index, Task.from_orm(payload)) for index, payload in chunk]
+        try:
+            session.add_all([task for _, task in tasks])
+            session.commit()
+        except Exception as exc:
+            session.rollback()
+            failed += [{"index": index, "error": exc.__class__.__name__} for index, _ in tasks]
+            continue
+        created.update(tasks)
+    return created, failed
+
+
 @router.patch("/{task_id}", response_model=Task)
 def update_task(
     task_id: int,
     payload: TaskUpdate,
     session: Session = Depends(get_session),
     scheduler: SchedulerService = Depends(SchedulerService.depends),
+    indexer: NoteIndexer = Depends(get_note_indexer),
 ) -> Task:
     task = session.get(Task, task_id)
     if not task:
@@ -57,7 +142,9 @@ def update_task(
     session.add(task)
     session.commit()
     session.refresh(task)
+    invalidate_briefing()
     scheduler.sync_task(task)
+    indexer.enqueue_task(task.id)
     return task
 
 
@@ -66,6 +153,7 @@ def complete_task(
     task_id: int,
     session: Session = Depends(get_session),
     scheduler: SchedulerService = Depends(SchedulerService.depends),
+    indexer: NoteIndexer = Depends(get_note_indexer),
 ) -> Task:
     task = session.get(Task, task_id)
     if not task:
@@ -75,7 +163,9 @@ def complete_task(
     session.add(task)
     session.commit()
     session.refresh(task)
+    invalidate_briefing()
     scheduler.cancel_task(task.id)
+    indexer.enqueue_task(task.id)
     return task
 
 
@@ -84,11 +174,21 @@ def delete_task(
     task_id: int,
     session: Session = Depends(get_session),
     scheduler: SchedulerService = Depends(SchedulerService.depends),
+    indexer: NoteIndexer = Depends(get_note_indexer),
 ) -> None:
     task = session.get(Task, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     session.delete(task)
+    record_deletion(session, "task", task_id)
     session.commit()
+    invalidate_briefing()
     scheduler.cancel_task(task_id)
+    indexer.enqueue_task(task_id)
+
 
+@router.get("/reminders/status", response_model=dict[str, object])
+def reminder_status(
+    dispatcher: NotificationDispatcher = Depends(get_notification_dispatcher),
+) -> dict[str, object]:
+    return dispatcher.status()
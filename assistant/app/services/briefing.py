@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+from fastapi.encoders import jsonable_encoder
+from sqlmodel import Session, select
+
+from ..models import Note, Task
+
+# Bounds staleness from writers in other processes (e.g. the CLI) that cannot
+# invalidate this process's cache.
+BRIEFING_CACHE_TTL = float(os.getenv("BRIEFING_CACHE_TTL", "300"))
+
+
+def build_briefing(session: Session, now: datetime) -> dict[str, object]:
+    start_of_day = datetime(now.year, now.month, now.day)
+    end_of_day = start_of_day + timedelta(days=1)
+    horizon = end_of_day + timedelta(days=7)
+
+    # One range scan over the (completed, due_date) index covers overdue, today and upcoming.
+    open_tasks = session.exec(
+        select(Task)
+        .where(
+            Task.completed == False,  # noqa: E712
+            Task.due_date.is_not(None),
+            Task.due_date < horizon,
+        )
+        .order_by(Task.due_date, Task.id)
+    ).all()
+    overdue = [task for task in open_tasks if task.due_date < start_of_day]
+    due_today = [task for task in open_tasks if start_of_day <= task.due_date < end_of_day]
+    upcoming = [task for task in open_tasks if task.due_date >= end_of_day]
+
+    latest_notes = session.exec(select(Note).order_by(Note.created_at.desc()).limit(5)).all()
+
+    priorities = sorted(
+        [task for task in due_today + upcoming if task.priority is not None],
+        key=lambda task: task.priority,
+    )
+
+    return jsonable_encoder(
+        {
+            "timestamp": now.isoformat(),
+            "due_today": due_today,
+            "overdue": overdue,
+            "upcoming": upcoming,
+            "latest_notes": latest_notes,
+            "priorities": priorities[:5],
+        }
+    )
+
+
+@dataclass
+class _CachedBriefing:
+    day: date
+    version: int
+    expires_at: float
+    etag: str
+    body: bytes
+
+
+class BriefingCache:
+    """Today's briefing, rebuilt only after a write or when the day changes.
+
+    Entries hold the encoded JSON body, so a hit is served without re-encoding.
+    """
+
+    def __init__(self, ttl: float = BRIEFING_CACHE_TTL) -> None:
+        self.ttl = ttl
+        self._version = 0
+        self._entry: _CachedBriefing | None = None
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._version += 1
+
+    def get(self, session: Session) -> tuple[str, bytes]:
+        now = datetime.utcnow()
+        entry = self._entry
+        if (
+            entry
+            and entry.day == now.date()
+            and entry.version == self._version
+            and entry.expires_at > time.monotonic()
+        ):
+            return entry.etag, entry.body
+        version = self._version
+        payload = build_briefing(session, now)
+        body = {key: value for key, value in payload.items() if key != "timestamp"}
+        digest = hashlib.sha1(json.dumps(body, sort_keys=True).encode("utf-8")).hexdigest()
+        etag = f'"{now.date().isoformat()}-{digest}"'
+        # Same encoding as JSONResponse.
+        content = json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            # A write that landed while building bumps the version and forces a rebuild next time.
+            self._entry = _CachedBriefing(now.date(), version, time.monotonic() + self.ttl, etag, content)
+        return etag, content
+
+
+@lru_cache
+def get_briefing_cache() -> BriefingCache:
+    return BriefingCache()
+
+
+def invalidate_briefing() -> None:
+    get_briefing_cache().invalidate()
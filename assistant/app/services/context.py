@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import math
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None  # type: ignore[assignment]
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("LLM_CONTEXT_TOKENS", "3000"))
+# Below this many spare tokens a truncated passage is not worth including.
+MIN_PASSAGE_TOKENS = 48
+# Shortest boundary overlap between two passages that is trimmed as duplicate text.
+MIN_OVERLAP_CHARS = 40
+CHARS_PER_TOKEN = 4
+
+
+@dataclass
+class Passage:
+    content: str
+    label: str = ""
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: str = "") -> int:
+    """Count tokens with the model's tokenizer, or estimate ~4 characters per token."""
+    encoding = _encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_tokens(text: str, limit: int, model: str = "") -> str:
+    encoding = _encoding(model)
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:limit])
+    cut = text[: limit * CHARS_PER_TOKEN]
+    space = cut.rfind(" ")
+    return cut[:space] if space > len(cut) // 2 else cut
+
+
+def _trim_overlap(previous: str, text: str) -> str:
+    """Drop the start of ``text`` if it repeats the end of ``previous`` (chunk overlap)."""
+    probe = text[:MIN_OVERLAP_CHARS]
+    if len(probe) < MIN_OVERLAP_CHARS:
+        return text
+    start = previous.find(probe, max(0, len(previous) - len(text)))
+    while start != -1:
+        overlap = len(previous) - start
+        if text.startswith(previous[start:]):
+            return text[overlap:].lstrip()
+        start = previous.find(probe, start + 1)
+    return text
+
+
+def pack_context(passages: Iterable[Passage], budget: int = CONTEXT_TOKEN_BUDGET, model: str = "") -> list[Passage]:
+    """Select passages, most relevant first, until ``budget`` tokens are used.
+
+    Exact and contained duplicates are skipped, text repeated at the boundary of
+    overlapping chunks is removed, and the last passage is truncated to fit.
+    """
+    packed: list[Passage] = []
+    normalized: list[str] = []
+    remaining = budget
+    for passage in passages:
+        text = passage.content.strip()
+        key = " ".join(text.split())
+        if not key or any(key in seen for seen in normalized):
+            continue
+        for previous in packed:
+            text = _trim_overlap(previous.content, text)
+        if not text:
+            continue
+        label = f"[{len(packed) + 1}] {passage.label}".rstrip()
+        cost = count_tokens(f"{label}\n{text}\n---\n", model)
+        if cost > remaining:
+            available = remaining - count_tokens(f"{label}\n\n---\n", model)
+            if available < MIN_PASSAGE_TOKENS:
+                break
+            text = truncate_tokens(text, available, model)
+            cost = remaining
+        packed.append(Passage(content=text, label=label))
+        normalized.append(key)
+        remaining -= cost
+        if remaining <= 0:
+            break
+    return packed
+
+
+def format_context(passages: Iterable[Passage]) -> str:
+    return "\n---\n".join(f"{passage.label}\n{passage.content}" if passage.label else passage.content for passage in passages)
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from array import array
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+from .cache import TTLCache
+from .metrics import REGISTRY, Counter, stage
+
+EMBED_BATCH_SIZE = int(os.getenv("RAG_EMBED_BATCH", "128"))
+QUERY_EMBED_CACHE_SIZE = int(os.getenv("RAG_QUERY_EMBED_CACHE", "1024"))
+QUERY_EMBED_CACHE_TTL = float(os.getenv("RAG_QUERY_EMBED_CACHE_TTL", "86400"))
+LOOKUP_BATCH = 500  # stays well below SQLite's bound-parameter limit
+
+EMBEDDING_LOOKUPS = REGISTRY.register(
+    Counter("assistant_embedding_cache_total", "Embedding lookups by cache outcome.", ("result",))
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    PRIMARY KEY (model, digest)
+) WITHOUT ROWID;
+"""
+
+
+def _unpack(blob: bytes) -> array:
+    vector = array("f")
+    vector.frombytes(blob)
+    return vector
+
+
+def content_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def model_id(function: Any) -> str:
+    """Identify an embedding function (name plus configuration) for cache keys."""
+    try:
+        name = function.name()
+    except Exception:
+        name = type(function).__name__
+    try:
+        config = json.dumps(function.get_config(), sort_keys=True, default=str)
+    except Exception:
+        config = ""
+    return f"{name}:{hashlib.sha1(config.encode('utf-8')).hexdigest()[:8]}" if config else str(name)
+
+
+class EmbeddingCache:
+    """Persistent float32 vectors keyed by (model, content hash) in SQLite.
+
+    Lives outside the Chroma directory so wiping or rebuilding the vector store
+    keeps every embedding already computed.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(str(self.path), check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get_many(self, model: str, digests: Sequence[str]) -> dict[str, array]:
+        found: dict[str, array] = {}
+        connection = self._connection()
+        for start in range(0, len(digests), LOOKUP_BATCH):
+            batch = digests[start : start + LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = connection.execute(
+                f"SELECT digest, vector FROM embeddings WHERE model = ? AND digest IN ({placeholders})",
+                (model, *batch),
+            )
+            for digest, blob in rows:
+                found[digest] = _unpack(blob)
+        return found
+
+    def put_many(self, model: str, vectors: Iterable[tuple[str, array]]) -> None:
+        rows = [(model, digest, vector.tobytes()) for digest, vector in vectors]
+        if not rows:
+            return
+        with self._write_lock:
+            connection = self._connection()
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, digest, vector) VALUES (?, ?, ?)", rows
+                )
+
+    def count(self, model: str | None = None) -> int:
+        if model is None:
+            return self._connection().execute("SELECT count(*) FROM embeddings").fetchone()[0]
+        return self._connection().execute("SELECT count(*) FROM embeddings WHERE model = ?", (model,)).fetchone()[0]
+
+
+class Embedder:
+    """Batched, content-addressed embedding in front of a Chroma embedding function.
+
+    Documents are looked up by the hash of their text first, so renamed,
+    duplicated or re-indexed content is never embedded twice; only misses are
+    sent to the model, ``batch_size`` at a time. Query embeddings are memoised
+    in memory for repeated questions.
+    """
+
+    def __init__(self, function: Any, cache: EmbeddingCache, batch_size: int = EMBED_BATCH_SIZE) -> None:
+        self.function = function
+        self.cache = cache
+        self.batch_size = max(1, batch_size)
+        self.model = model_id(function)
+        self.queries: TTLCache[str, list[float]] = TTLCache(QUERY_EMBED_CACHE_SIZE, QUERY_EMBED_CACHE_TTL)
+        self.hits = 0
+        self.misses = 0
+
+    def embed_documents(self, texts: Sequence[str]) -> list[list[float]]:
+        digests = [content_digest(text) for text in texts]
+        vectors = self.cache.get_many(self.model, list(dict.fromkeys(digests)))
+        missing = {digest: text for digest, text in zip(digests, texts) if digest not in vectors}
+        hits = len(texts) - sum(1 for digest in digests if digest in missing)
+        self.hits += hits
+        self.misses += len(missing)
+        EMBEDDING_LOOKUPS.inc(hits, result="hit")
+        EMBEDDING_LOOKUPS.inc(len(missing), result="miss")
+        if missing:
+            items = list(missing.items())
+            for start in range(0, len(items), self.batch_size):
+                batch = items[start : start + self.batch_size]
+                with stage("rag.embed"):
+                    computed = self.function([text for _, text in batch])
+                fresh = [(digest, array("f", vector)) for (digest, _), vector in zip(batch, computed)]
+                self.cache.put_many(self.model, fresh)
+                vectors.update(fresh)
+        return [vectors[digest].tolist() for digest in digests]
+
+    def embed_query(self, text: str) -> list[float]:
+        cached = self.queries.get(text)
+        if cached is not None:
+            return cached
+        with stage("rag.embed_query"):
+            vector = array("f", self.function([text])[0]).tolist()
+        self.queries.set(text, vector)
+        return vector
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "model": self.model,
+            "batch_size": self.batch_size,
+            "document_hits": self.hits,
+            "document_misses": self.misses,
+            "cached_vectors": self.cache.count(self.model),
+            "queries": self.queries.stats(),
+        }
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+EXTRACT_WORKERS = int(os.getenv("RAG_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+EXTRACT_TIMEOUT = float(os.getenv("RAG_EXTRACT_TIMEOUT", "120"))
+# Formats whose parsing is expensive enough to run in the process pool and cache.
+POOLED_EXTENSIONS = {".pdf"}
+
+
+def extract_pages(path: str) -> list[str]:
+    """Return the text of a file, one entry per page for paged formats."""
+    if path.lower().endswith(".pdf"):
+        from pypdf import PdfReader
+
+        reader = PdfReader(path)
+        return [page.extract_text() or "" for page in reader.pages]
+    return [Path(path).read_text(encoding="utf-8", errors="ignore")]
+
+
+@dataclass
+class ExtractionJob:
+    source: str
+    path: Path
+    digest: str
+
+
+@dataclass
+class ExtractionResult:
+    job: ExtractionJob
+    pages: list[str] = field(default_factory=list)
+    error: str | None = None
+    cached: bool = False
+
+
+class ExtractionCache:
+    """Extracted text stored on disk by content hash."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest[:2] / f"{digest}.json"
+
+    def get(self, digest: str) -> list[str] | None:
+        try:
+            return json.loads(self._path(digest).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def put(self, digest: str, pages: list[str]) -> None:
+        path = self._path(digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(pages), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def discard(self, digest: str) -> None:
+        try:
+            self._path(digest).unlink()
+        except OSError:
+            pass
+
+
+class ExtractionPipeline:
+    """Extract text for many files, yielding results as they complete.
+
+    Cheap formats are read inline; PDFs are parsed in a process pool with at most
+    ``workers`` files in flight. A file that exceeds ``timeout`` seconds is
+    reported as failed and the pool is recycled so the stuck worker cannot hold
+    up the rest of the run. ``workers=0`` extracts everything in-process.
+    """
+
+    def __init__(
+        self,
+        cache: ExtractionCache,
+        workers: int = EXTRACT_WORKERS,
+        timeout: float = EXTRACT_TIMEOUT,
+    ) -> None:
+        self.cache = cache
+        self.workers = workers
+        self.timeout = timeout
+
+    def run(self, jobs: Iterable[ExtractionJob]) -> Iterator[ExtractionResult]:
+        pooled: list[ExtractionJob] = []
+        for job in jobs:
+            if job.path.suffix.lower() not in POOLED_EXTENSIONS:
+                yield self._extract_inline(job, cache=False)
+                continue
+            pages = self.cache.get(job.digest)
+            if pages is not None:
+                yield ExtractionResult(job, pages, cached=True)
+            elif self.workers <= 0:
+                yield self._extract_inline(job, cache=True)
+            else:
+                pooled.append(job)
+        if pooled:
+            yield from self._run_pool(pooled)
+
+    def _extract_inline(self, job: ExtractionJob, cache: bool) -> ExtractionResult:
+        try:
+            pages = extract_pages(str(job.path))
+        except Exception as exc:
+            return ExtractionResult(job, error=repr(exc))
+        if cache:
+            self.cache.put(job.digest, pages)
+        return ExtractionResult(job, pages)
+
+    def _run_pool(self, jobs: list[ExtractionJob]) -> Iterator[ExtractionResult]:
+        queue = list(reversed(jobs))
+        retried: set[str] = set()
+        pool = self._new_pool(len(jobs))
+        in_flight: dict[Future, tuple[ExtractionJob, float]] = {}
+        try:
+            while queue or in_flight:
+                while queue and len(in_flight) < self.workers:
+                    job = queue.pop()
+                    in_flight[pool.submit(extract_pages, str(job.path))] = (job, time.monotonic())
+                next_deadline = min(started for _, started in in_flight.values()) + self.timeout
+                done, _ = wait(
+                    in_flight,
+                    timeout=max(0.0, next_deadline - time.monotonic()),
+                    return_when=FIRST_COMPLETED,
+                )
+                broken = False
+                for future in done:
+                    job, _ = in_flight.pop(future)
+                    try:
+                        pages = future.result()
+                    except BrokenProcessPool:
+                        # A worker died (e.g. the parser crashed); the culprit is unknown,
+                        # so every affected file gets one more attempt in a fresh pool.
+                        broken = True
+                        if job.source in retried:
+                            yield ExtractionResult(job, error="extraction worker crashed")
+                        else:
+                            retried.add(job.source)
+                            queue.append(job)
+                        continue
+                    except Exception as exc:
+                        yield ExtractionResult(job, error=repr(exc))
+                        continue
+                    self.cache.put(job.digest, pages)
+                    yield ExtractionResult(job, pages)
+                now = time.monotonic()
+                expired = [future for future, (_, started) in in_flight.items() if now - started >= self.timeout]
+                for future in expired:
+                    job, _ = in_flight.pop(future)
+                    logger.warning("Extraction of %s timed out after %.0fs", job.source, self.timeout)
+                    yield ExtractionResult(job, error=f"timed out after {self.timeout:.0f}s")
+                if not expired and not broken:
+                    continue
+                # A stuck or dead worker cannot be recovered; replace the pool and retry the survivors.
+                queue.extend(job for job, _ in in_flight.values())
+                in_flight.clear()
+                self._terminate(pool)
+                pool = self._new_pool(len(queue))
+        finally:
+            self._terminate(pool)
+
+    def _new_pool(self, pending: int) -> ProcessPoolExecutor:
+        # ``spawn`` avoids forking a process that already runs Chroma and scheduler threads.
+        return ProcessPoolExecutor(
+            max_workers=max(1, min(self.workers, pending)),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    @staticmethod
+    def _terminate(pool: ProcessPoolExecutor) -> None:
+        processes = list((getattr(pool, "_processes", None) or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
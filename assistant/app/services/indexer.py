@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+from .rag import SUPPORTED_EXTENSIONS, RAGService, SyncReport, get_rag_service
+
+try:
+    import watchfiles
+except ImportError:  # pragma: no cover - optional dependency
+    watchfiles = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+WATCH_DEBOUNCE = float(os.getenv("RAG_WATCH_DEBOUNCE", "2"))
+WATCH_POLL_INTERVAL = float(os.getenv("RAG_WATCH_POLL_INTERVAL", "30"))
+
+
+def _is_supported(_change: object, path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in SUPPORTED_EXTENSIONS
+
+
+class VaultIndexer:
+    """Keep the RAG index in step with the vault from a background thread.
+
+    Filesystem events (inotify and friends through ``watchfiles``) are debounced
+    and turned into incremental syncs; without ``watchfiles`` or when the vault
+    does not exist yet, the vault is re-scanned every ``poll_interval`` seconds,
+    which is cheap because the manifest only stats unchanged files.
+    """
+
+    def __init__(
+        self,
+        rag: RAGService | None = None,
+        debounce: float = WATCH_DEBOUNCE,
+        poll_interval: float = WATCH_POLL_INTERVAL,
+    ) -> None:
+        self._rag = rag
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.mode = "inotify" if watchfiles else "polling"
+        self.queued: set[str] = set()
+        self.failed: dict[str, str] = {}
+        self.syncing = False
+        self.last_sync: datetime | None = None
+        self.last_report: SyncReport | None = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def rag(self) -> RAGService:
+        # Resolved on first use so creating the indexer never loads the vector store.
+        return self._rag or get_rag_service()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="vault-indexer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def status(self) -> dict[str, object]:
+        with self._lock:
+            queued = sorted(self.queued)
+            failed = dict(self.failed)
+        return {
+            "mode": self.mode,
+            "running": bool(self._thread and self._thread.is_alive()),
+            "syncing": self.syncing,
+            "queued": queued,
+            "indexed_files": len(self.rag.manifest.records),
+            "failed": failed,
+            "last_sync": self.last_sync.isoformat() if self.last_sync else None,
+            "last_report": self.last_report.as_dict() if self.last_report else None,
+        }
+
+    def sync_now(self) -> SyncReport | None:
+        self.syncing = True
+        try:
+            report = self.rag.sync()
+        except Exception:
+            logger.exception("Vault sync failed")
+            return None
+        finally:
+            self.syncing = False
+        with self._lock:
+            self.queued.clear()
+            for source in report.indexed:
+                self.failed.pop(source, None)
+            self.failed.update(report.errors)
+            for source in [source for source in self.failed if not (self.rag.vault_path / source).exists()]:
+                del self.failed[source]
+        self.last_sync = datetime.utcnow()
+        self.last_report = report
+        return report
+
+    def _run(self) -> None:
+        self.sync_now()
+        while not self._stop.is_set():
+            if watchfiles and self.rag.vault_path.is_dir():
+                self.mode = "inotify"
+                self._watch()
+            else:
+                self.mode = "polling"
+                if not self._stop.wait(self.poll_interval):
+                    self.sync_now()
+
+    def _watch(self) -> None:
+        root = self.rag.vault_path.resolve()
+        try:
+            for changes in watchfiles.watch(
+                root,
+                watch_filter=_is_supported,
+                debounce=int(self.debounce * 1000),
+                stop_event=self._stop,
+            ):
+                with self._lock:
+                    for _, path in changes:
+                        self.queued.add(Path(path).relative_to(root).as_posix())
+                self.sync_now()
+        except Exception:
+            # The vault may have been removed or become unreadable; fall back to a poll cycle.
+            logger.exception("Vault watcher stopped")
+            if not self._stop.wait(self.poll_interval):
+                self.sync_now()
+
+
+@lru_cache
+def get_vault_indexer() -> VaultIndexer:
+    return VaultIndexer()
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import logging
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from .metadata import DocumentMetadata, SearchFilter
+
+logger = logging.getLogger(__name__)
+
+TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    id INTEGER PRIMARY KEY,
+    chunk_id TEXT NOT NULL UNIQUE,
+    source TEXT NOT NULL,
+    page INTEGER,
+    "offset" INTEGER,
+    content TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_chunks_source ON chunks (source);
+CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
+    content, content='chunks', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS chunks_ai AFTER INSERT ON chunks BEGIN
+    INSERT INTO chunks_fts (rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS chunks_ad AFTER DELETE ON chunks BEGIN
+    INSERT INTO chunks_fts (chunks_fts, rowid, content) VALUES ('delete', old.id, old.content);
+END;
+CREATE TABLE IF NOT EXISTS documents (
+    source TEXT PRIMARY KEY,
+    file_type TEXT,
+    mtime INTEGER
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS document_tags (
+    tag TEXT NOT NULL,
+    source TEXT NOT NULL,
+    PRIMARY KEY (tag, source)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_document_tags_source ON document_tags (source);
+"""
+
+
+def build_match_query(text: str) -> str:
+    """Turn free text into an FTS5 query: any term may match, BM25 ranks the rest.
+
+    Terms that tokenise into several parts (``TCK-42``, ``v1.2``) become phrases so
+    identifiers still match as a unit.
+    """
+    clauses = []
+    for word in text.split():
+        parts = TERM_PATTERN.findall(word)
+        if parts:
+            clauses.append('"' + " ".join(parts) + '"')
+    return " OR ".join(dict.fromkeys(clauses))
+
+
+class LexicalIndex:
+    """BM25 full-text index over the same chunks as the vector store (SQLite FTS5).
+
+    Each thread reads through its own connection; writes are serialised. WAL
+    journaling keeps searches running while the indexer writes.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        connection = self._connection()
+        connection.executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(str(self.path), check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT count(*) FROM chunks").fetchone()[0]
+
+    def iter_sources(self, prefix: str = "", batch_size: int = 500) -> Iterator[list[str]]:
+        """Yield the indexed sources starting with ``prefix`` in sorted batches."""
+        after = prefix
+        while True:
+            rows = self._connection().execute(
+                "SELECT DISTINCT source FROM chunks WHERE source > ? AND source < ? ORDER BY source LIMIT ?",
+                (after, prefix + "\uffff", batch_size),
+            ).fetchall()
+            if not rows:
+                return
+            yield [row[0] for row in rows]
+            after = rows[-1][0]
+
+    def upsert(self, rows: Iterable[tuple[str, str, int | None, int, str]]) -> None:
+        """Insert ``(chunk_id, source, page, offset, content)`` rows, replacing equal ids."""
+        rows = list(rows)
+        if not rows:
+            return
+        connection = self._connection()
+        with self._write_lock, connection:
+            connection.executemany("DELETE FROM chunks WHERE chunk_id = ?", [(row[0],) for row in rows])
+            connection.executemany(
+                'INSERT INTO chunks (chunk_id, source, page, "offset", content) VALUES (?, ?, ?, ?, ?)',
+                rows,
+            )
+
+    def put_documents(self, documents: dict[str, DocumentMetadata]) -> None:
+        """Store the filterable attributes of each source, replacing earlier ones."""
+        if not documents:
+            return
+        connection = self._connection()
+        with self._write_lock, connection:
+            connection.executemany("DELETE FROM document_tags WHERE source = ?", [(source,) for source in documents])
+            connection.executemany(
+                "INSERT OR REPLACE INTO documents (source, file_type, mtime) VALUES (?, ?, ?)",
+                [(source, document.file_type, document.mtime) for source, document in documents.items()],
+            )
+            connection.executemany(
+                "INSERT OR IGNORE INTO document_tags (tag, source) VALUES (?, ?)",
+                [(tag, source) for source, document in documents.items() for tag in document.tags],
+            )
+
+    def delete_sources(self, sources: Iterable[str]) -> None:
+        sources = list(sources)
+        if not sources:
+            return
+        params = [(source,) for source in sources]
+        connection = self._connection()
+        with self._write_lock, connection:
+            connection.executemany("DELETE FROM chunks WHERE source = ?", params)
+            connection.executemany("DELETE FROM documents WHERE source = ?", params)
+            connection.executemany("DELETE FROM document_tags WHERE source = ?", params)
+
+    def clear(self) -> None:
+        connection = self._connection()
+        with self._write_lock, connection:
+            connection.execute("DELETE FROM chunks")
+            connection.execute("DELETE FROM documents")
+            connection.execute("DELETE FROM document_tags")
+
+    def search(self, text: str, limit: int, filters: SearchFilter | None = None) -> list[dict[str, object]]:
+        """Return the best ``limit`` chunks by BM25, best first, among those matching ``filters``."""
+        match = build_match_query(text)
+        if not match:
+            return []
+        clause, params = filters.sql_clause("c.source") if filters else ("1", [])
+        rows = self._connection().execute(
+            f"""
+            SELECT c.chunk_id, c.source, c.page, c."offset", c.content, bm25(chunks_fts) AS score
+            FROM chunks_fts JOIN chunks AS c ON c.id = chunks_fts.rowid
+            WHERE chunks_fts MATCH ? AND {clause}
+            ORDER BY score
+            LIMIT ?
+            """,
+            (match, *params, limit),
+        ).fetchall()
+        return [
+            {
+                "id": chunk_id,
+                "content": content,
+                "metadata": {"source": source, "page": page, "offset": offset},
+                "score": -score,
+            }
+            for chunk_id, source, page, offset, content, score in rows
+        ]
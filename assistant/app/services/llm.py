@@ -1,51 +1,208 @@
 from __future__ import annotations
 
+import asyncio
 import os
-from typing import Iterable, Optional
+import threading
+from functools import lru_cache
+from types import ModuleType
+from typing import TYPE_CHECKING, AsyncIterator, Iterable, Optional
 
-try:
-    from openai import OpenAI
-except ImportError:  # pragma: no cover - optional dependency
-    OpenAI = None  # type: ignore[assignment]
+if TYPE_CHECKING:
+    import httpx
+    from openai import AsyncOpenAI, OpenAI, Timeout
+
+from .context import CONTEXT_TOKEN_BUDGET, Passage, count_tokens, format_context, pack_context
+from .metrics import LLM_TOKENS, METRICS_ENABLED, stage
+
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+# Transient failures (connection errors, 408/409/429/5xx) are retried by the
+# OpenAI client with exponential backoff and jitter.
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "30"))
+
+
+@lru_cache
+def _openai() -> ModuleType | None:
+    """Import the OpenAI SDK on first use; it is optional and slow to load."""
+    try:
+        import openai
+    except ImportError:  # pragma: no cover - optional dependency
+        return None
+    return openai
 
 
 class LLMService:
     def __init__(self) -> None:
-        api_key = os.getenv("OPENAI_API_KEY")
-        base_url = os.getenv("OPENAI_BASE_URL")
+        self.api_key = os.getenv("OPENAI_API_KEY")
+        self.base_url = os.getenv("OPENAI_BASE_URL")
         self.model = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+        self.context_budget = CONTEXT_TOKEN_BUDGET
         self.client: Optional[OpenAI]
-        if OpenAI and api_key:
-            self.client = OpenAI(api_key=api_key, base_url=base_url)
+        openai = _openai() if self.api_key else None
+        if openai:
+            self.client = openai.OpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                timeout=self._timeout(),
+                max_retries=LLM_MAX_RETRIES,
+                http_client=openai.DefaultHttpxClient(limits=self._limits()),
+            )
         else:
             self.client = None
+        # Caps upstream calls from the threadpool (sync) and the event loop (async).
+        self._sync_slots = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
+        self._async_loop: asyncio.AbstractEventLoop | None = None
+        self._async_client: Optional[AsyncOpenAI] = None
+        self._async_slots: asyncio.Semaphore | None = None
+
+    @staticmethod
+    def _timeout() -> "Timeout":
+        return _openai().Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT)
 
-    def answer(self, question: str, documents: Iterable[str]) -> str:
-        context = "\n---\n".join(documents)
+    @staticmethod
+    def _limits() -> "httpx.Limits":
+        import httpx
+
+        return httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_CONNECTIONS,
+            keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+        )
+
+    def _async_state(self) -> tuple[AsyncOpenAI, asyncio.Semaphore]:
+        # The pooled async client and semaphore belong to one event loop; they are
+        # created on first use and rebuilt only if the loop changes (e.g. in tests).
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            self._async_loop = loop
+            self._async_client = _openai().AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                timeout=self._timeout(),
+                max_retries=LLM_MAX_RETRIES,
+                http_client=_openai().DefaultAsyncHttpxClient(limits=self._limits()),
+            )
+            self._async_slots = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+        return self._async_client, self._async_slots  # type: ignore[return-value]
+
+    async def aclose(self) -> None:
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+            self._async_loop = None
+
+    def answer(self, question: str, documents: Iterable[str | Passage]) -> str:
+        context = self.build_context(documents)
         if not context:
             return "No supporting context was provided."
         if not self.client:
-            # Fallback summarisation without external API access
-            snippet = context[:500]
-            return (
-                "(Local) Based on the available notes: \n"
-                f"{snippet}\n\nQuestion: {question}\n"
-                "Consider reviewing the referenced documents for more detail."
+            return self._local_answer(question, context)
+        with self._sync_slots, stage("llm.completion"):
+            completion = self.client.chat.completions.create(
+                model=self.model,
+                messages=self._messages(question, context),
             )
+        self._record_usage(completion.usage)
+        return completion.choices[0].message.content or ""
+
+    async def aanswer(self, question: str, documents: Iterable[str | Passage]) -> str:
+        """Async variant of :meth:`answer`; the event loop is free while waiting upstream."""
+        context = self.build_context(documents)
+        if not context:
+            return "No supporting context was provided."
+        if not self.client:
+            return self._local_answer(question, context)
+        client, slots = self._async_state()
+        async with slots:
+            with stage("llm.completion"):
+                completion = await client.chat.completions.create(
+                    model=self.model,
+                    messages=self._messages(question, context),
+                )
+        self._record_usage(completion.usage)
+        return completion.choices[0].message.content or ""
+
+    async def astream_answer(self, question: str, documents: Iterable[str | Passage]) -> AsyncIterator[str]:
+        """Yield the answer in pieces as the model produces them."""
+        context = self.build_context(documents)
+        if not context:
+            yield "No supporting context was provided."
+            return
+        if not self.client:
+            # Keep the streaming contract for the local fallback: emit it line by line.
+            for line in self._local_answer(question, context).splitlines(keepends=True):
+                yield line
+            return
+        client, slots = self._async_state()
+        messages = self._messages(question, context)
+        pieces: list[str] = []
+        async with slots:
+            with stage("llm.completion"):
+                stream = await client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    stream=True,
+                )
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        pieces.append(delta)
+                        yield delta
+        self._record_stream_usage(messages, pieces)
+
+    def build_context(self, documents: Iterable[str | Passage]) -> str:
+        """Pack retrieved passages (most relevant first) into the prompt's token budget."""
+        passages = (Passage(document) if isinstance(document, str) else document for document in documents)
+        with stage("llm.pack_context"):
+            return format_context(pack_context(passages, budget=self.context_budget, model=self.model))
+
+    @staticmethod
+    def _record_usage(usage: object | None) -> None:
+        if usage is None:
+            return
+        LLM_TOKENS.inc(getattr(usage, "prompt_tokens", 0) or 0, kind="prompt")
+        LLM_TOKENS.inc(getattr(usage, "completion_tokens", 0) or 0, kind="completion")
+
+    def _record_stream_usage(self, messages: list[dict[str, str]], pieces: list[str]) -> None:
+        # Streamed responses carry no usage block; estimate with the context tokenizer.
+        if not METRICS_ENABLED:
+            return
+        LLM_TOKENS.inc(sum(count_tokens(message["content"], self.model) for message in messages), kind="prompt")
+        LLM_TOKENS.inc(count_tokens("".join(pieces), self.model), kind="completion")
+
+    def _local_answer(self, question: str, context: str) -> str:
+        # Fallback summarisation without external API access
+        snippet = context[:500]
+        return (
+            "(Local) Based on the available notes: \n"
+            f"{snippet}\n\nQuestion: {question}\n"
+            "Consider reviewing the referenced documents for more detail."
+        )
+
+    def _messages(self, question: str, context: str) -> list[dict[str, str]]:
         prompt = (
             "You are a helpful assistant with access to the following notes from the user's vault. "
             "Use them to answer the question."
         )
-        messages = [
+        return [
             {"role": "system", "content": prompt},
             {
                 "role": "user",
-                "content": f"Context:\n{context}\n\nQuestion: {question}\nAnswer concisely and cite sources if possible.",
+                "content": f"Context:\n{context}\n\nQuestion: {question}\nAnswer concisely and cite sources by their [number] if possible.",
             },
         ]
-        completion = self.client.chat.completions.create(model=self.model, messages=messages)
-        return completion.choices[0].message.content or ""
 
     @classmethod
     def depends(cls) -> "LLMService":
-        return cls()
+        return get_llm_service()
+
+
+@lru_cache
+def get_llm_service() -> LLMService:
+    """Return the process-wide LLM client so HTTP connections are pooled and reused."""
+    return LLMService()
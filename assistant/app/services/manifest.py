@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterator
+
+HASH_BLOCK_SIZE = 1 << 20
+
+
+@dataclass
+class FileRecord:
+    path: str
+    size: int
+    mtime_ns: int
+    sha256: str
+    # Chunks the file produced; None in manifests written before it was recorded.
+    chunks: int | None = None
+
+
+@dataclass
+class FileChange:
+    path: str
+    size: int
+    mtime_ns: int
+    previous: FileRecord | None = None
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def scan_vault(root: Path, extensions: set[str]) -> Iterator[tuple[str, os.stat_result]]:
+    """Yield ``(relative_path, stat)`` for supported files using ``os.scandir``."""
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = list(os.scandir(current))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(Path(entry.path))
+                continue
+            if not entry.is_file():
+                continue
+            if os.path.splitext(entry.name)[1].lower() not in extensions:
+                continue
+            relative = Path(entry.path).relative_to(root).as_posix()
+            yield relative, entry.stat()
+
+
+class VaultManifest:
+    """Persistent record of what has been indexed, keyed by vault-relative path.
+
+    Size and mtime are compared first so an unchanged vault is detected from
+    ``stat`` alone; the content hash is only computed for files that look changed.
+    ``signature`` identifies how files were indexed (e.g. chunking settings); when
+    it changes the previous records are moved to ``stale_sources`` so the caller
+    can drop their vectors and re-index everything.
+    """
+
+    def __init__(self, path: Path, signature: str = "") -> None:
+        self.path = path
+        self.signature = signature
+        self.records: dict[str, FileRecord] = {}
+        self.stale_sources: list[str] = []
+        self._dirty = False
+        self.load()
+
+    def load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            raw = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        records = {item["path"]: FileRecord(**item) for item in raw.get("files", [])}
+        if raw.get("signature", "") != self.signature:
+            self.stale_sources = list(records)
+            self._dirty = True
+            return
+        self.records = records
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        payload = {"signature": self.signature, "files": [asdict(record) for record in self.records.values()]}
+        tmp_path.write_text(json.dumps(payload), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def clear(self) -> None:
+        if self.records:
+            self.records = {}
+            self._dirty = True
+
+    def expects_chunks(self) -> bool:
+        """Whether the indexed files should have left any chunks in the stores."""
+        return any(record.chunks is None or record.chunks > 0 for record in self.records.values())
+
+    def get(self, path: str) -> FileRecord | None:
+        return self.records.get(path)
+
+    def put(self, record: FileRecord) -> None:
+        self.records[record.path] = record
+        self._dirty = True
+
+    def remove(self, path: str) -> None:
+        if self.records.pop(path, None) is not None:
+            self._dirty = True
+
+    def diff(self, root: Path, extensions: set[str]) -> tuple[list[FileChange], list[str], int]:
+        """Compare the vault on disk with the manifest.
+
+        Returns candidate changes (new files or files whose size/mtime moved),
+        the paths that disappeared, and the number of untouched files.
+        """
+        changes: list[FileChange] = []
+        seen: set[str] = set()
+        unchanged = 0
+        for relative, stat in scan_vault(root, extensions):
+            seen.add(relative)
+            record = self.records.get(relative)
+            if record and record.size == stat.st_size and record.mtime_ns == stat.st_mtime_ns:
+                unchanged += 1
+                continue
+            changes.append(FileChange(relative, stat.st_size, stat.st_mtime_ns, record))
+        removed = [path for path in self.records if path not in seen]
+        return changes, removed, unchanged
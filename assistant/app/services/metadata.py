@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import PurePosixPath
+from typing import Any
+
+# Folder prefixes are stored as dir_0 ("projects"), dir_1 ("projects/alpha"), ...
+# so a path filter is a single equality test in the vector store.
+MAX_FOLDER_DEPTH = 8
+FRONT_MATTER_PATTERN = re.compile(r"\A---[ \t]*\r?\n(.*?)\r?\n---[ \t]*(?:\r?\n|\Z)", re.DOTALL)
+TAG_KEY_PATTERN = re.compile(r"^tags?\s*:\s*(.*)$", re.IGNORECASE)
+LIST_ITEM_PATTERN = re.compile(r"^\s*-\s+(.*)$")
+
+ChunkMetadata = dict[str, str | int | bool]
+
+
+def normalize_tag(tag: str) -> str:
+    """``#Project Alpha`` -> ``project_alpha``; safe as part of a metadata key."""
+    return re.sub(r"\W+", "_", tag.strip().strip("'\"").lstrip("#").lower()).strip("_")
+
+
+def _split_tags(value: str) -> list[str]:
+    value = value.strip()
+    if value.startswith("[") and value.endswith("]"):
+        value = value[1:-1]
+    separator = "," if "," in value else None
+    return [tag for tag in (normalize_tag(part) for part in value.split(separator)) if tag]
+
+
+def front_matter_tags(text: str) -> tuple[str, ...]:
+    """Tags from a Markdown YAML front matter block.
+
+    Handles the usual shapes (``tags: [a, b]``, ``tags: a, b``, ``tags: a b`` and a
+    ``- item`` list on the following lines) without needing a YAML parser.
+    """
+    match = FRONT_MATTER_PATTERN.match(text)
+    if not match:
+        return ()
+    tags: list[str] = []
+    collecting = False
+    for line in match.group(1).splitlines():
+        key = TAG_KEY_PATTERN.match(line)
+        if key:
+            tags += _split_tags(key.group(1))
+            collecting = not key.group(1).strip()
+            continue
+        item = LIST_ITEM_PATTERN.match(line)
+        if collecting and item:
+            tags += _split_tags(item.group(1))
+        elif line.strip():
+            collecting = False
+    return tuple(dict.fromkeys(tags))
+
+
+@dataclass
+class DocumentMetadata:
+    """Per-document attributes copied onto every chunk at ingest time."""
+
+    file_type: str
+    folder: str = ""
+    mtime: int | None = None
+    tags: tuple[str, ...] = ()
+
+    def as_chunk_metadata(self) -> ChunkMetadata:
+        metadata: ChunkMetadata = {"file_type": self.file_type, "folder": self.folder}
+        if self.mtime is not None:
+            metadata["mtime"] = self.mtime
+        parts = self.folder.split("/") if self.folder else []
+        for depth in range(min(len(parts), MAX_FOLDER_DEPTH)):
+            metadata[f"dir_{depth}"] = "/".join(parts[: depth + 1])
+        for tag in self.tags:
+            metadata[f"tag_{tag}"] = True
+        return metadata
+
+
+def vault_document_metadata(path: str, mtime_ns: int, text: str | None = None) -> DocumentMetadata:
+    """Metadata for a vault file; ``text`` is searched for front matter tags (Markdown only)."""
+    posix = PurePosixPath(path)
+    folder = str(posix.parent)
+    return DocumentMetadata(
+        file_type=posix.suffix.lower().lstrip("."),
+        folder="" if folder == "." else folder,
+        mtime=mtime_ns // 1_000_000_000,
+        tags=front_matter_tags(text) if text else (),
+    )
+
+
+def epoch_seconds(value: datetime) -> int:
+    # Naive datetimes are UTC, like every timestamp the app stores.
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
+@dataclass
+class SearchFilter:
+    """Restricts retrieval to part of the index.
+
+    ``path`` is a vault folder (matching everything below it) or a single file;
+    ``file_types`` are extensions or ``note``/``task``; the date range applies to
+    the file's modification time; every tag in ``tags`` must be present.
+    """
+
+    path: str | None = None
+    file_types: list[str] = field(default_factory=list)
+    modified_after: datetime | None = None
+    modified_before: datetime | None = None
+    tags: list[str] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self.path = self.path.strip().strip("/") if self.path else None
+        # The last segment may name a file, which matches on its source instead.
+        if self.path and len(self.path.split("/")) > MAX_FOLDER_DEPTH + 1:
+            raise ValueError(f"Path filters support at most {MAX_FOLDER_DEPTH} folder levels")
+        self.file_types = list(dict.fromkeys(kind.strip().lower().lstrip(".") for kind in self.file_types if kind))
+        self.tags = list(dict.fromkeys(tag for tag in map(normalize_tag, self.tags) if tag))
+        if self.modified_after and self.modified_before and self.modified_after >= self.modified_before:
+            raise ValueError("modified_after must be earlier than modified_before")
+
+    def __bool__(self) -> bool:
+        return bool(self.path or self.file_types or self.modified_after or self.modified_before or self.tags)
+
+    def chroma_where(self) -> dict[str, Any] | None:
+        """The filter as a Chroma ``where`` clause, or ``None`` when it matches everything."""
+        conditions: list[dict[str, Any]] = []
+        if self.path:
+            depth = len(self.path.split("/")) - 1
+            if depth < MAX_FOLDER_DEPTH:
+                conditions.append({"$or": [{f"dir_{depth}": self.path}, {"source": self.path}]})
+            else:
+                conditions.append({"source": self.path})
+        if self.file_types:
+            conditions.append({"file_type": {"$in": self.file_types}})
+        if self.modified_after:
+            conditions.append({"mtime": {"$gte": epoch_seconds(self.modified_after)}})
+        if self.modified_before:
+            conditions.append({"mtime": {"$lt": epoch_seconds(self.modified_before)}})
+        conditions += [{f"tag_{tag}": True} for tag in self.tags]
+        if not conditions:
+            return None
+        return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+    def sql_clause(self, source: str = "source") -> tuple[str, list[Any]]:
+        """The filter as an SQL condition on the lexical index's ``source`` column."""
+        conditions: list[str] = []
+        params: list[Any] = []
+        if self.path:
+            # A prefix test rather than a range bound, which would miss names
+            # with characters above U+FFFF.
+            prefix = self.path + "/"
+            conditions.append(f"({source} = ? OR substr({source}, 1, ?) = ?)")
+            params += [self.path, len(prefix), prefix]
+        document: list[str] = []
+        if self.file_types:
+            document.append(f"file_type IN ({', '.join('?' * len(self.file_types))})")
+            params += self.file_types
+        if self.modified_after:
+            document.append("mtime >= ?")
+            params.append(epoch_seconds(self.modified_after))
+        if self.modified_before:
+            document.append("mtime < ?")
+            params.append(epoch_seconds(self.modified_before))
+        if document:
+            conditions.append(f"{source} IN (SELECT source FROM documents WHERE {' AND '.join(document)})")
+        for tag in self.tags:
+            conditions.append(f"{source} IN (SELECT source FROM document_tags WHERE tag = ?)")
+            params.append(tag)
+        return " AND ".join(conditions) or "1", params
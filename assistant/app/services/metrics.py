@@ -0,0 +1,351 @@
+from __future__ import annotations
+
+import bisect
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Callable, Iterable, Sequence, TypeVar
+
+from apscheduler.events import (
+    EVENT_ALL_JOBS_REMOVED,
+    EVENT_JOB_ADDED,
+    EVENT_JOB_ERROR,
+    EVENT_JOB_EXECUTED,
+    EVENT_JOB_MISSED,
+    EVENT_JOB_REMOVED,
+    EVENT_JOB_SUBMITTED,
+    EVENT_SCHEDULER_STARTED,
+)
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in {"1", "true", "yes"}
+# Requests slower than this many milliseconds are logged with a per-stage breakdown; 0 disables.
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "0"))
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self._samples()
+
+    def _samples(self) -> Iterable[str]:
+        return ()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> Iterable[str]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+
+
+class Gauge(_Metric):
+    """A settable gauge, or one read from ``function`` at scrape time.
+
+    ``function`` returns a number, or a mapping of label tuples to numbers.
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        function: Callable[[], float | dict[LabelValues, float]] | None = None,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+        self.function = function
+
+    def set(self, value: float, **labels: str) -> None:
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def _samples(self) -> Iterable[str]:
+        if self.function is not None:
+            try:
+                value = self.function()
+            except Exception:
+                logger.debug("Gauge %s callback failed", self.name, exc_info=True)
+                return
+            items = list(value.items()) if isinstance(value, dict) else [((), value)]
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        for key, number in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {number}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last), sum]
+        self._values: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def _samples(self) -> Iterable[str]:
+        with self._lock:
+            items = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, 'le="%s"' % bound)
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}"
+
+
+MetricT = TypeVar("MetricT", bound=_Metric)
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: MetricT) -> MetricT:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format (0.0.4)."""
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+STAGE_SECONDS = REGISTRY.register(
+    Histogram("assistant_stage_seconds", "Time spent per processing stage.", ("stage",))
+)
+HTTP_SECONDS = REGISTRY.register(
+    Histogram("assistant_http_request_seconds", "HTTP request latency.", ("method", "route", "status"))
+)
+DB_SECONDS = REGISTRY.register(
+    Histogram(
+        "assistant_db_query_seconds",
+        "SQL statement execution time.",
+        ("operation",),
+        buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+    )
+)
+LLM_TOKENS = REGISTRY.register(
+    Counter("assistant_llm_tokens_total", "Tokens sent to and received from the LLM.", ("kind",))
+)
+SCHEDULER_LAG = REGISTRY.register(
+    Histogram("assistant_scheduler_lag_seconds", "Delay between a job's scheduled and actual run time.", ("job",))
+)
+SCHEDULER_RUNS = REGISTRY.register(
+    Counter("assistant_scheduler_runs_total", "Scheduler job executions by outcome.", ("job", "outcome"))
+)
+
+# Per-request stage totals, set by the HTTP middleware; None outside a request.
+_breakdown: ContextVar[dict[str, float] | None] = ContextVar("metrics_breakdown", default=None)
+
+
+class _Stage:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self) -> "_Stage":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        elapsed = time.perf_counter() - self.started
+        STAGE_SECONDS.observe(elapsed, stage=self.name)
+        record_stage(self.name, elapsed)
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullStage":
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        return None
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name: str) -> _Stage | _NullStage:
+    """Context manager timing one stage into ``assistant_stage_seconds`` and the request breakdown."""
+    return _Stage(name) if METRICS_ENABLED else _NULL_STAGE
+
+
+def record_stage(name: str, elapsed: float) -> None:
+    breakdown = _breakdown.get()
+    if breakdown is not None:
+        breakdown[name] = breakdown.get(name, 0.0) + elapsed
+
+
+def start_request() -> dict[str, float]:
+    breakdown: dict[str, float] = {}
+    _breakdown.set(breakdown)
+    return breakdown
+
+
+def log_if_slow(method: str, route: str, status: int, elapsed: float, breakdown: dict[str, float]) -> None:
+    if not SLOW_REQUEST_MS or elapsed * 1000 < SLOW_REQUEST_MS:
+        return
+    stages = ", ".join(f"{name}={1000 * seconds:.1f}ms" for name, seconds in sorted(breakdown.items()))
+    logger.warning("Slow request %s %s -> %s in %.1fms (%s)", method, route, status, 1000 * elapsed, stages or "no stages")
+
+
+def instrument_engine(engine) -> None:
+    """Time every SQL statement on ``engine``; idempotent."""
+    if not METRICS_ENABLED or getattr(engine, "_metrics_instrumented", False):
+        return
+    engine._metrics_instrumented = True
+
+    # The start time lives on the per-statement execution context, so a failed
+    # statement (which never reaches after_cursor_execute) leaves nothing behind.
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(_conn, _cursor, _statement, _parameters, context, _executemany) -> None:
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(_conn, _cursor, statement, _parameters, context, _executemany) -> None:
+        started = getattr(context, "_metrics_started", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        DB_SECONDS.observe(elapsed, operation=operation)
+        record_stage("db", elapsed)
+
+
+def instrument_scheduler(scheduler) -> None:
+    """Record fire delay and outcomes of every job, and expose job counts per store."""
+    if not METRICS_ENABLED or getattr(scheduler, "_metrics_instrumented", False):
+        return
+    scheduler._metrics_instrumented = True
+    outcomes = {EVENT_JOB_EXECUTED: "executed", EVENT_JOB_ERROR: "error", EVENT_JOB_MISSED: "missed"}
+
+    def _on_job(job_event) -> None:
+        # Job ids look like "task-12-once" or "db-maintenance"; the prefix keeps labels bounded.
+        job = job_event.job_id.split("-", 1)[0]
+        if job_event.code == EVENT_JOB_SUBMITTED:
+            now = datetime.now(timezone.utc)
+            for run_time in job_event.scheduled_run_times:
+                SCHEDULER_LAG.observe(max(0.0, (now - run_time).total_seconds()), job=job)
+            return
+        SCHEDULER_RUNS.inc(job=job, outcome=outcomes.get(job_event.code, "other"))
+
+    scheduler.add_listener(_on_job, EVENT_JOB_SUBMITTED | EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED)
+
+    # Job ids per store, kept current from add/remove events so a scrape never
+    # loads the job stores. Listing them once at start-up picks up persisted jobs.
+    job_ids: dict[str, set[str]] = {}
+    job_ids_lock = threading.Lock()
+
+    def _seed() -> None:
+        with job_ids_lock:
+            job_ids.clear()
+            for job in scheduler.get_jobs():
+                job_ids.setdefault(job._jobstore_alias, set()).add(job.id)
+
+    def _on_store_change(store_event) -> None:
+        if store_event.code == EVENT_SCHEDULER_STARTED:
+            _seed()
+            return
+        with job_ids_lock:
+            if store_event.code == EVENT_JOB_ADDED:
+                job_ids.setdefault(store_event.jobstore, set()).add(store_event.job_id)
+            elif store_event.code == EVENT_JOB_REMOVED:
+                job_ids.get(store_event.jobstore, set()).discard(store_event.job_id)
+            elif store_event.alias:
+                job_ids.pop(store_event.alias, None)
+            else:
+                job_ids.clear()
+
+    scheduler.add_listener(
+        _on_store_change, EVENT_SCHEDULER_STARTED | EVENT_JOB_ADDED | EVENT_JOB_REMOVED | EVENT_ALL_JOBS_REMOVED
+    )
+    if scheduler.running:
+        _seed()
+
+    def _job_counts() -> dict[LabelValues, float]:
+        with job_ids_lock:
+            return {(alias,): float(len(ids)) for alias, ids in job_ids.items()}
+
+    REGISTRY.register(Gauge("assistant_scheduler_jobs", "Scheduled jobs per job store.", ("jobstore",), _job_counts))
+
+
+def register_gauge(name: str, documentation: str, function: Callable[[], float]) -> None:
+    """Expose ``function()`` as a gauge read at scrape time (e.g. a queue depth)."""
+    REGISTRY.register(Gauge(name, documentation, function=function))
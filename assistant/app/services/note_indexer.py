@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable
+
+from sqlalchemy import or_
+from sqlmodel import Session, select
+
+from ..deps import engine
+from ..models import Note, Task
+from ..utils.pagination import keyset_after, order_clauses
+from .metadata import DocumentMetadata, epoch_seconds
+from .rag import INDEX_SIGNATURE, RAG_ENABLED, RAGService, get_rag_service
+from .sync import SYNC_SETTLE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+INDEX_TASKS = os.getenv("RAG_INDEX_TASKS", "false").lower() in {"1", "true", "yes"}
+NOTE_BATCH_SIZE = int(os.getenv("RAG_NOTE_BATCH", "64"))
+NOTE_BATCH_LINGER = float(os.getenv("RAG_NOTE_LINGER", "0.5"))
+RECONCILE_INTERVAL = float(os.getenv("RAG_NOTE_RECONCILE_INTERVAL", "300"))
+# Deletes normally reach the index through the event path; this full scan for
+# leftovers runs at start-up and then this rarely.
+ORPHAN_SWEEP_INTERVAL = float(os.getenv("RAG_NOTE_ORPHAN_SWEEP_INTERVAL", "86400"))
+QUEUE_SIZE = 10_000
+MAX_RETRY_DELAY = 60.0
+
+
+def note_source(note_id: int) -> str:
+    return f"note:{note_id}"
+
+
+def task_source(task_id: int) -> str:
+    return f"task:{task_id}"
+
+
+def note_text(note: Note) -> str:
+    return f"# {note.title}\n\n{note.content}"
+
+
+def task_text(task: Task) -> str:
+    lines = [f"# Task: {task.title}"]
+    if task.description:
+        lines.append(task.description)
+    if task.due_date:
+        lines.append(f"Due: {task.due_date.isoformat()}")
+    lines.append("Status: completed" if task.completed else "Status: open")
+    return "\n\n".join(lines)
+
+
+def item_metadata(kind: str, item: Note | Task) -> DocumentMetadata:
+    """Filterable attributes of a note or task: ``file_type`` is its kind, ``mtime`` its last change."""
+    return DocumentMetadata(file_type=kind, mtime=epoch_seconds(item.updated_at or item.created_at))
+
+
+def _encode_watermark(position: list[Any]) -> list[Any]:
+    stamp, item_id = position
+    return [stamp.isoformat() if stamp else None, item_id]
+
+
+def _decode_watermark(value: Any) -> list[Any] | None:
+    if not isinstance(value, list) or len(value) != 2 or not isinstance(value[1], int):
+        return None
+    stamp, item_id = value
+    try:
+        return [datetime.fromisoformat(stamp) if stamp is not None else None, item_id]
+    except (TypeError, ValueError):
+        return None
+
+
+class NoteIndexer:
+    """Write-behind indexing of notes (and optionally tasks) into the RAG store.
+
+    Write paths only enqueue ``(kind, id)`` events. A worker thread coalesces
+    them into batches, reloads the current rows and upserts or removes their
+    chunks, so create, update and delete are all handled the same way. A
+    reconciliation pass at start-up and every ``RECONCILE_INTERVAL`` seconds
+    re-indexes rows changed after the persisted ``(updated_at, id)`` watermark
+    (by the CLI, before a crash, while indexing was off or dropped from a full
+    queue). Chunks of rows that no longer exist are dropped by a sweep at
+    start-up and every ``ORPHAN_SWEEP_INTERVAL`` seconds. The watermark is
+    stored with ``INDEX_SIGNATURE``; when that changes it is discarded, so
+    every row is indexed again once.
+    """
+
+    def __init__(
+        self,
+        rag_factory: Callable[[], RAGService] = get_rag_service,
+        index_tasks: bool = INDEX_TASKS,
+        enabled: bool = RAG_ENABLED,
+    ) -> None:
+        self._rag_factory = rag_factory
+        self.index_tasks = index_tasks
+        self.enabled = enabled
+        self._queue: queue.Queue[tuple[str, int]] = queue.Queue(maxsize=QUEUE_SIZE)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._watermarks: dict[str, list[Any]] = {}
+        self.dropped = 0
+        self.last_error: str | None = None
+
+    def enqueue_note(self, note_id: int | None) -> None:
+        self._enqueue("note", note_id)
+
+    def enqueue_task(self, task_id: int | None) -> None:
+        if self.index_tasks:
+            self._enqueue("task", task_id)
+
+    def _enqueue(self, kind: str, item_id: int | None) -> None:
+        if item_id is None or not self.enabled:
+            return
+        try:
+            self._queue.put_nowait((kind, item_id))
+        except queue.Full:
+            # The next reconciliation pass re-indexes anything dropped here.
+            self.dropped += 1
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="note-indexer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def status(self) -> dict[str, object]:
+        return {
+            "enabled": self.enabled,
+            "running": bool(self._thread and self._thread.is_alive()),
+            "queued": self._queue.qsize(),
+            "dropped": self.dropped,
+            "index_tasks": self.index_tasks,
+            "watermarks": self._encoded_watermarks(),
+            "last_error": self.last_error,
+        }
+
+    def _run(self) -> None:
+        self._watermarks = self._load_watermarks()
+        self._safe_reconcile(sweep_orphans=True)
+        next_reconcile = time.monotonic() + RECONCILE_INTERVAL
+        next_sweep = time.monotonic() + ORPHAN_SWEEP_INTERVAL
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=max(0.1, min(1.0, next_reconcile - time.monotonic())))
+            except queue.Empty:
+                if time.monotonic() >= next_reconcile:
+                    sweep = time.monotonic() >= next_sweep
+                    self._safe_reconcile(sweep_orphans=sweep)
+                    next_reconcile = time.monotonic() + RECONCILE_INTERVAL
+                    if sweep:
+                        next_sweep = time.monotonic() + ORPHAN_SWEEP_INTERVAL
+                continue
+            events = {first}
+            deadline = time.monotonic() + NOTE_BATCH_LINGER
+            while len(events) < NOTE_BATCH_SIZE:
+                try:
+                    events.add(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            self._process_with_retry(events)
+
+    def _process_with_retry(self, events: set[tuple[str, int]]) -> None:
+        delay = 1.0
+        while not self._stop.is_set():
+            try:
+                self._process(events)
+                self.last_error = None
+                return
+            except Exception as exc:
+                self.last_error = repr(exc)
+                logger.exception("Indexing %d note/task events failed; retrying in %.0fs", len(events), delay)
+                if self._stop.wait(delay):
+                    return
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+
+    def _process(self, events: set[tuple[str, int]]) -> None:
+        note_ids = sorted(item_id for kind, item_id in events if kind == "note")
+        task_ids = sorted(item_id for kind, item_id in events if kind == "task")
+        documents: dict[str, str] = {}
+        metadata: dict[str, DocumentMetadata] = {}
+        removed: list[str] = []
+        with Session(engine) as session:
+            if note_ids:
+                notes = session.exec(select(Note).where(Note.id.in_(note_ids))).all()
+                found = {note.id for note in notes}
+                documents.update({note_source(note.id): note_text(note) for note in notes})
+                metadata.update({note_source(note.id): item_metadata("note", note) for note in notes})
+                removed += [note_source(note_id) for note_id in note_ids if note_id not in found]
+            if task_ids:
+                tasks = session.exec(select(Task).where(Task.id.in_(task_ids))).all()
+                found = {task.id for task in tasks}
+                documents.update({task_source(task.id): task_text(task) for task in tasks})
+                metadata.update({task_source(task.id): item_metadata("task", task) for task in tasks})
+                removed += [task_source(task_id) for task_id in task_ids if task_id not in found]
+        rag = self._rag_factory()
+        rag.index_documents(documents, metadata)
+        rag.remove_documents(removed)
+
+    def _safe_reconcile(self, sweep_orphans: bool) -> None:
+        try:
+            self.reconcile(sweep_orphans)
+        except Exception as exc:
+            self.last_error = repr(exc)
+            logger.exception("Note index reconciliation failed")
+
+    def reconcile(self, sweep_orphans: bool = True) -> None:
+        """Index rows changed since the watermark and, with ``sweep_orphans``, drop chunks of deleted rows."""
+        rag = self._rag_factory()
+        kinds: list[tuple[str, type[Note] | type[Task], Callable[[int], str]]] = [("note", Note, note_source)]
+        if self.index_tasks:
+            kinds.append(("task", Task, task_source))
+        # Rows younger than the settle window are left for the next pass, so a
+        # transaction that commits late cannot slip behind the watermark.
+        horizon = datetime.utcnow() - timedelta(seconds=SYNC_SETTLE_SECONDS)
+        for kind, model, source in kinds:
+            ordering = [(model.updated_at, False), (model.id, False)]
+            position = self._watermarks.get(kind)
+            indexed = 0
+            while True:
+                statement = select(model.updated_at, model.id).where(
+                    or_(model.updated_at.is_(None), model.updated_at <= horizon)
+                )
+                if position is not None:
+                    statement = statement.where(keyset_after(ordering, position))
+                with Session(engine) as session:
+                    rows = session.exec(statement.order_by(*order_clauses(ordering)).limit(NOTE_BATCH_SIZE)).all()
+                if not rows:
+                    break
+                self._process({(kind, item_id) for _, item_id in rows})
+                position = list(rows[-1])
+                self._watermarks[kind] = position
+                self._save_watermarks()
+                indexed += len(rows)
+            removed = self._remove_orphans(rag, kind, model, source) if sweep_orphans else 0
+            if indexed or removed:
+                logger.info("Reconciled %s index: %d indexed, %d removed", kind, indexed, removed)
+
+    @staticmethod
+    def _remove_orphans(
+        rag: RAGService, kind: str, model: type[Note] | type[Task], source: Callable[[int], str]
+    ) -> int:
+        removed = 0
+        for names in rag.lexical.iter_sources(f"{kind}:"):
+            ids = [int(name.split(":", 1)[1]) for name in names]
+            with Session(engine) as session:
+                existing = set(session.exec(select(model.id).where(model.id.in_(ids))).all())
+            orphaned = [source(item_id) for item_id in ids if item_id not in existing]
+            rag.remove_documents(orphaned)
+            removed += len(orphaned)
+        return removed
+
+    def _watermark_path(self) -> Path:
+        return self._rag_factory().data_path / "notes_watermark.json"
+
+    def _load_watermarks(self) -> dict[str, list[Any]]:
+        try:
+            raw = json.loads(self._watermark_path().read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        # Older files (and other signatures) trigger one full pass.
+        if not isinstance(raw, dict) or raw.get("signature") != INDEX_SIGNATURE:
+            return {}
+        decoded = {kind: _decode_watermark(value) for kind, value in raw.get("watermarks", {}).items()}
+        return {kind: position for kind, position in decoded.items() if position is not None}
+
+    def _encoded_watermarks(self) -> dict[str, list[Any]]:
+        return {kind: _encode_watermark(position) for kind, position in self._watermarks.items()}
+
+    def _save_watermarks(self) -> None:
+        path = self._watermark_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({"signature": INDEX_SIGNATURE, "watermarks": self._encoded_watermarks()}))
+        os.replace(tmp_path, path)
+
+
+@lru_cache
+def get_note_indexer() -> NoteIndexer:
+    return NoteIndexer()
@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import shutil
+import subprocess
+import threading
+import time
+import urllib.request
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_SINKS = os.getenv("NOTIFY_SINKS", "log,stdout")
+NOTIFY_WEBHOOK_URL = os.getenv("NOTIFY_WEBHOOK_URL", "")
+NOTIFY_WORKERS = int(os.getenv("NOTIFY_WORKERS", "2"))
+NOTIFY_BATCH_SIZE = int(os.getenv("NOTIFY_BATCH_SIZE", "100"))
+NOTIFY_BATCH_LINGER = float(os.getenv("NOTIFY_BATCH_LINGER", "0.2"))
+NOTIFY_MAX_ATTEMPTS = int(os.getenv("NOTIFY_MAX_ATTEMPTS", "5"))
+NOTIFY_TIMEOUT = float(os.getenv("NOTIFY_TIMEOUT", "5"))
+QUEUE_SIZE = 10_000
+SINK_QUEUE_SIZE = 1000  # batches waiting for one sink
+MAX_RETRY_DELAY = 60.0
+LATENCY_WINDOW = 1000
+
+
+@dataclass
+class Notification:
+    title: str
+    body: str
+    key: str | None = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def coalesce_key(self) -> tuple[str, ...]:
+        return (self.key,) if self.key else (self.title, self.body)
+
+
+class Sink(ABC):
+    name = "sink"
+
+    @abstractmethod
+    def send(self, batch: list[Notification]) -> None:
+        """Deliver ``batch``; raising marks it for retry."""
+
+
+class LogSink(Sink):
+    name = "log"
+
+    def send(self, batch: list[Notification]) -> None:
+        for item in batch:
+            logger.info("[NOTIFY] %s - %s", item.title, item.body)
+
+
+class StdoutSink(Sink):
+    name = "stdout"
+
+    def send(self, batch: list[Notification]) -> None:
+        print("".join(f"\n🔔 {item.title}: {item.body}\n" for item in batch), flush=True)
+
+
+class WebhookSink(Sink):
+    """POSTs each batch as ``{"notifications": [{"title", "body"}, ...]}``."""
+
+    name = "webhook"
+
+    def __init__(self, url: str = NOTIFY_WEBHOOK_URL, timeout: float = NOTIFY_TIMEOUT) -> None:
+        if not url:
+            raise ValueError("NOTIFY_WEBHOOK_URL is required for the webhook sink")
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, batch: list[Notification]) -> None:
+        payload = {"notifications": [{"title": item.title, "body": item.body} for item in batch]}
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class DesktopSink(Sink):
+    """Desktop popups via ``notify-send``; a burst is summarised in one popup."""
+
+    name = "desktop"
+
+    def __init__(self, timeout: float = NOTIFY_TIMEOUT) -> None:
+        self.command = shutil.which("notify-send")
+        if not self.command:
+            raise ValueError("notify-send is not installed")
+        self.timeout = timeout
+
+    def send(self, batch: list[Notification]) -> None:
+        if len(batch) == 1:
+            title, body = batch[0].title, batch[0].body
+        else:
+            title = f"{len(batch)} reminders"
+            body = "\n".join(item.title for item in batch)
+        subprocess.run([self.command, title, body], check=True, timeout=self.timeout)
+
+
+SINKS: dict[str, type[Sink]] = {
+    "log": LogSink,
+    "stdout": StdoutSink,
+    "webhook": WebhookSink,
+    "desktop": DesktopSink,
+}
+
+
+def build_sinks(spec: str = NOTIFY_SINKS) -> list[Sink]:
+    sinks: list[Sink] = []
+    for name in (part.strip().lower() for part in spec.split(",")):
+        if not name:
+            continue
+        if name not in SINKS:
+            logger.warning("Unknown notification sink '%s'", name)
+            continue
+        try:
+            sinks.append(SINKS[name]())
+        except ValueError as exc:
+            logger.warning("Notification sink '%s' disabled: %s", name, exc)
+    return sinks
+
+
+@dataclass
+class _SinkLane:
+    """One sink with its own batch queue and worker, so it can fail or stall alone."""
+
+    sink: Sink
+    queue: queue.Queue[list[Notification]] = field(default_factory=lambda: queue.Queue(maxsize=SINK_QUEUE_SIZE))
+    thread: threading.Thread | None = None
+    delivered: int = 0
+    failed: int = 0
+    dropped: int = 0
+    last_error: str | None = None
+
+
+class NotificationDispatcher:
+    """Delivers notifications off the scheduler's threads.
+
+    ``notify`` only enqueues. Worker threads drain the bounded queue in batches
+    (waiting up to ``NOTIFY_BATCH_LINGER`` seconds so a burst of reminders due
+    at the same moment travels together), drop duplicates within a batch and
+    pass the batch to every sink's own queue. Each sink has a worker of its own
+    that retries failures with exponential backoff up to ``NOTIFY_MAX_ATTEMPTS``
+    times, so a failing webhook never holds up the log or the desktop.
+    """
+
+    def __init__(self, sinks: list[Sink] | None = None, workers: int = NOTIFY_WORKERS) -> None:
+        self.sinks = build_sinks() if sinks is None else sinks
+        self.workers = max(1, workers)
+        self._queue: queue.Queue[Notification] = queue.Queue(maxsize=QUEUE_SIZE)
+        self._lanes = [_SinkLane(sink) for sink in self.sinks]
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.dropped = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.last_error: str | None = None
+
+    def notify(self, title: str, body: str, key: str | None = None) -> bool:
+        self.start()
+        try:
+            self._queue.put_nowait(Notification(title, body, key))
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            logger.warning("Notification queue full; dropped '%s'", title)
+            return False
+
+    def start(self) -> None:
+        with self._lock:
+            if any(thread.is_alive() for thread in self._threads):
+                return
+            self._stop.clear()
+            self._threads = [
+                threading.Thread(target=self._run, name=f"notifier-{index}", daemon=True)
+                for index in range(self.workers)
+            ]
+            for lane in self._lanes:
+                lane.thread = threading.Thread(
+                    target=self._run_lane, args=(lane,), name=f"notifier-{lane.sink.name}", daemon=True
+                )
+            for thread in self._threads + [lane.thread for lane in self._lanes]:
+                thread.start()
+
+    def stop(self, timeout: float | None = 5) -> None:
+        """Stop the workers once the queues are drained (retries are abandoned)."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        for lane in self._lanes:
+            if lane.thread:
+                lane.thread.join(timeout)
+
+    def status(self) -> dict[str, object]:
+        latencies = sorted(self._latencies)
+
+        def percentile(fraction: float) -> float | None:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(fraction * len(latencies)))], 4)
+
+        return {
+            "running": any(thread.is_alive() for thread in self._threads),
+            "sinks": {
+                lane.sink.name: {
+                    "queued": lane.queue.qsize(),
+                    "delivered": lane.delivered,
+                    "failed": lane.failed,
+                    "dropped": lane.dropped,
+                    "last_error": lane.last_error,
+                }
+                for lane in self._lanes
+            },
+            "queued": self._queue.qsize(),
+            "delivered": sum(lane.delivered for lane in self._lanes),
+            "failed": sum(lane.failed for lane in self._lanes),
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "batches": self.batches,
+            "latency_p50": percentile(0.5),
+            "latency_p95": percentile(0.95),
+            "latency_max": round(latencies[-1], 4) if latencies else None,
+            "last_error": self.last_error,
+        }
+
+    def _run(self) -> None:
+        while True:
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return
+                continue
+            batch = [first]
+            deadline = time.monotonic() + NOTIFY_BATCH_LINGER
+            while len(batch) < NOTIFY_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: list[Notification]) -> None:
+        unique: dict[tuple[str, ...], Notification] = {}
+        for item in batch:
+            unique.setdefault(item.coalesce_key, item)
+        items = list(unique.values())
+        with self._lock:
+            self.batches += 1
+            self.coalesced += len(batch) - len(items)
+        for lane in self._lanes:
+            try:
+                lane.queue.put_nowait(items)
+            except queue.Full:
+                with self._lock:
+                    lane.dropped += len(items)
+                logger.warning("Sink %s is backed up; dropped %d notifications", lane.sink.name, len(items))
+
+    def _run_lane(self, lane: _SinkLane) -> None:
+        while True:
+            try:
+                items = lane.queue.get(timeout=0.5)
+            except queue.Empty:
+                # Exit only once the batching workers can add nothing more.
+                if self._stop.is_set() and not any(thread.is_alive() for thread in self._threads):
+                    return
+                continue
+            ok = self._send_with_retry(lane, items)
+            now = time.monotonic()
+            with self._lock:
+                if ok:
+                    lane.delivered += len(items)
+                    self._latencies.extend(now - item.enqueued_at for item in items)
+                else:
+                    lane.failed += len(items)
+
+    def _send_with_retry(self, lane: _SinkLane, items: list[Notification]) -> bool:
+        sink = lane.sink
+        delay = 1.0
+        for attempt in range(1, NOTIFY_MAX_ATTEMPTS + 1):
+            try:
+                sink.send(items)
+                return True
+            except Exception as exc:
+                lane.last_error = self.last_error = f"{sink.name}: {exc!r}"
+                if attempt == NOTIFY_MAX_ATTEMPTS or self._stop.is_set():
+                    logger.exception("Sink %s failed to deliver %d notifications", sink.name, len(items))
+                    return False
+                logger.warning("Sink %s failed (%s); retrying in %.0fs", sink.name, exc, delay)
+                if self._stop.wait(delay):
+                    return False
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+        return False
+
+
+@lru_cache
+def get_notification_dispatcher() -> NotificationDispatcher:
+    return NotificationDispatcher()
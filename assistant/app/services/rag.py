@@ -1,24 +1,219 @@
 from __future__ import annotations
 
+import asyncio
+import contextvars
+import hashlib
+import logging
 import os
-from dataclasses import dataclass
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable
+from typing import Any, AsyncIterator
 
-import chromadb
-from chromadb.config import Settings
-from pypdf import PdfReader
-
-from ..services.llm import LLMService
+from ..deps import DATABASE_URL
+from ..services.llm import LLMService, get_llm_service
+from .cache import TTLCache
+from .context import Passage
+from .embeddings import EMBED_BATCH_SIZE, Embedder, EmbeddingCache
+from .extraction import ExtractionCache, ExtractionJob, ExtractionPipeline
+from .lexical import LexicalIndex
+from .manifest import FileChange, FileRecord, VaultManifest, file_digest
+from .metadata import ChunkMetadata, DocumentMetadata, SearchFilter, vault_document_metadata
+from .metrics import stage
 
 SUPPORTED_EXTENSIONS = {".txt", ".md", ".pdf"}
 DEFAULT_COLLECTION = "vault"
+CHUNK_SIZE = int(os.getenv("RAG_CHUNK_SIZE", "1200"))
+CHUNK_OVERLAP = int(os.getenv("RAG_CHUNK_OVERLAP", "200"))
+# How documents are chunked and which metadata chunks carry; bumping the suffix
+# re-indexes the vault and every indexed note and task.
+INDEX_SIGNATURE = f"chunks:{CHUNK_SIZE}:{CHUNK_OVERLAP}:metadata-1"
+HEADING_PATTERN = re.compile(r"^#{1,6}\s", re.MULTILINE)
+SOURCE_DELETE_BATCH = 500
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "256"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "3600"))
+NO_RESULTS_ANSWER = "I could not find relevant information in the vault."
+SEARCH_MODES = ("hybrid", "vector", "lexical")
+DEFAULT_SEARCH_MODE = os.getenv("RAG_SEARCH_MODE", "hybrid")
+# "false" serves without the RAG stack: no /ask routes, vault watching or note indexing.
+RAG_ENABLED = os.getenv("RAG_ENABLED", "true").lower() in {"1", "true", "yes"}
+# Reciprocal-rank fusion constant and how many candidates each retriever contributes per result.
+RRF_K = 60
+HYBRID_CANDIDATES = 3
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
 class DocumentChunk:
     source: str
     content: str
+    index: int = 0
+    page: int | None = None
+    offset: int = 0
+    attributes: ChunkMetadata = field(default_factory=dict)
+
+    @property
+    def id(self) -> str:
+        digest = hashlib.sha1(self.content.encode("utf-8")).hexdigest()[:12]
+        return f"{self.source}#{self.index}:{digest}"
+
+    def metadata(self) -> ChunkMetadata:
+        metadata: ChunkMetadata = {**self.attributes, "source": self.source, "chunk": self.index, "offset": self.offset}
+        if self.page is not None:
+            metadata["page"] = self.page
+        return metadata
+
+
+def split_sections(text: str, markdown: bool, size: int) -> list[tuple[int, str]]:
+    """Split text at Markdown headings, merging neighbouring sections up to ``size``."""
+    starts = [0]
+    if markdown:
+        starts += [match.start() for match in HEADING_PATTERN.finditer(text) if match.start() > 0]
+    bounds = list(zip(starts, starts[1:] + [len(text)]))
+    sections: list[tuple[int, str]] = []
+    for start, end in bounds:
+        if sections and (end - sections[-1][0]) <= size:
+            section_start = sections[-1][0]
+            sections[-1] = (section_start, text[section_start:end])
+        else:
+            sections.append((start, text[start:end]))
+    return sections
+
+
+def split_window(text: str, size: int, overlap: int) -> list[tuple[int, str]]:
+    """Split text into windows of at most ``size`` characters overlapping by ``overlap``.
+
+    Window ends are pulled back to the nearest paragraph, line or word break.
+    """
+    if len(text) <= size:
+        return [(0, text)]
+    pieces: list[tuple[int, str]] = []
+    start = 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        if end < len(text):
+            floor = start + size // 2
+            for separator in ("\n\n", "\n", " "):
+                cut = text.rfind(separator, floor, end)
+                if cut > start:
+                    end = cut
+                    break
+        pieces.append((start, text[start:end]))
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+        space = text.find(" ", start, end)
+        if 0 <= space - start < overlap // 2:
+            start = space + 1
+    return pieces
+
+
+def chunk_document(
+    source: str,
+    pages: list[str],
+    markdown: bool = False,
+    size: int = CHUNK_SIZE,
+    overlap: int = CHUNK_OVERLAP,
+    metadata: DocumentMetadata | None = None,
+) -> list[DocumentChunk]:
+    """Split extracted pages into chunks with stable ids and page/offset metadata.
+
+    ``offset`` is the character position of the chunk within its page (or within
+    the whole file for unpaged formats). Document ``metadata`` is copied onto
+    every chunk so searches can filter on it.
+    """
+    paged = len(pages) > 1
+    attributes = metadata.as_chunk_metadata() if metadata else {}
+    chunks: list[DocumentChunk] = []
+    for page_number, text in enumerate(pages, start=1):
+        for section_offset, section in split_sections(text, markdown, size):
+            for piece_offset, piece in split_window(section, size, overlap):
+                content = piece.strip()
+                if not content:
+                    continue
+                offset = section_offset + piece_offset + (len(piece) - len(piece.lstrip()))
+                chunks.append(
+                    DocumentChunk(
+                        source=source,
+                        content=content,
+                        index=len(chunks),
+                        page=page_number if paged else None,
+                        offset=offset,
+                        attributes=attributes,
+                    )
+                )
+    return chunks
+
+
+@dataclass
+class _PendingBatch:
+    chunks: list[DocumentChunk] = field(default_factory=list)
+    records: list[FileRecord] = field(default_factory=list)
+    replaced: list[str] = field(default_factory=list)
+    documents: dict[str, DocumentMetadata] = field(default_factory=dict)
+
+
+@dataclass
+class SyncReport:
+    added: int = 0
+    updated: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    duration: float = 0.0
+    indexed: list[str] = field(default_factory=list)
+    errors: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def changed(self) -> int:
+        return self.added + self.updated + self.removed
+
+    def as_dict(self) -> dict[str, object]:
+        data = asdict(self)
+        data.pop("indexed")
+        data.pop("errors")
+        data["duration"] = round(self.duration, 4)
+        return data
+
+
+def default_lexical_path(chroma_path: Path) -> Path:
+    """Place the full-text index next to the app's SQLite database when there is one."""
+    configured = os.getenv("LEXICAL_DB_PATH")
+    if configured:
+        return Path(configured)
+    if DATABASE_URL.startswith("sqlite:///"):
+        database = Path(DATABASE_URL[len("sqlite:///") :])
+        return database.with_name(f"{database.stem}_fts.db")
+    return chroma_path / "lexical.db"
+
+
+def default_embedding_cache_path(chroma_path: Path) -> Path:
+    """Keep cached embeddings outside the Chroma directory so they survive a wipe of it."""
+    configured = os.getenv("EMBEDDING_CACHE_PATH")
+    if configured:
+        return Path(configured)
+    if DATABASE_URL.startswith("sqlite:///"):
+        database = Path(DATABASE_URL[len("sqlite:///") :])
+        return database.with_name(f"{database.stem}_embeddings.db")
+    return chroma_path.with_name(f"{chroma_path.name}_embeddings.db")
+
+
+def fuse_rankings(rankings: list[list[dict[str, object]]], limit: int) -> list[dict[str, object]]:
+    """Merge ranked hit lists with reciprocal-rank fusion, keyed on chunk id."""
+    scores: dict[str, float] = {}
+    hits: dict[str, dict[str, object]] = {}
+    for ranking in rankings:
+        for rank, hit in enumerate(ranking):
+            chunk_id = str(hit["id"])
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+            hits.setdefault(chunk_id, hit)
+    ordered = sorted(scores, key=scores.__getitem__, reverse=True)[:limit]
+    return [hits[chunk_id] for chunk_id in ordered]
 
 
 class RAGService:
@@ -27,68 +222,361 @@ class RAGService:
         vault_path: Path | None = None,
         collection_name: str = DEFAULT_COLLECTION,
         llm: LLMService | None = None,
+        embedding_function: Any | None = None,
     ) -> None:
         self.vault_path = vault_path or Path(os.getenv("VAULT_PATH", "vault"))
+        chroma_path = Path(os.getenv("CHROMA_DB_PATH", ".chroma"))
+        self.data_path = chroma_path
+        # Imported here rather than at module load: chromadb (and its embedding
+        # stack) takes seconds to import and most processes never need it.
+        import chromadb
+        from chromadb.config import Settings
+        from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+
         self.client = chromadb.PersistentClient(
-            path=os.getenv("CHROMA_DB_PATH", ".chroma"),
+            path=str(chroma_path),
             settings=Settings(anonymized_telemetry=False),
         )
-        self.collection = self.client.get_or_create_collection(collection_name)
-        self.llm = llm or LLMService()
-        self._ensure_index()
+        embedding_function = embedding_function or DefaultEmbeddingFunction()
+        self.collection = self.client.get_or_create_collection(collection_name, embedding_function=embedding_function)
+        self.embedder = Embedder(embedding_function, EmbeddingCache(default_embedding_cache_path(chroma_path)))
+        self.manifest = VaultManifest(
+            chroma_path / f"{collection_name}_manifest.json",
+            signature=INDEX_SIGNATURE,
+        )
+        self.lexical = LexicalIndex(default_lexical_path(chroma_path))
+        self._search_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="rag-search")
+        self.extraction_cache = ExtractionCache(chroma_path / "extracted")
+        self.extractor = ExtractionPipeline(self.extraction_cache)
+        self.llm = llm or get_llm_service()
+        self.answer_cache: TTLCache[str, str] = TTLCache(ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL)
+        self._index_lock = threading.Lock()
 
     @classmethod
     def depends(cls) -> "RAGService":
-        return cls()
+        return get_rag_service()
 
-    def _ensure_index(self) -> None:
-        docs = list(self._iter_documents())
-        if not docs:
-            return
-        existing = set(self.collection.get()["ids"])
-        new_docs = [(doc.source, doc) for doc in docs if doc.source not in existing]
-        if not new_docs:
-            return
-        self.collection.add(
-            documents=[doc.content for _, doc in new_docs],
-            ids=[source for source, _ in new_docs],
-            metadatas=[{"source": source} for source, _ in new_docs],
-        )
+    def sync(self) -> SyncReport:
+        """Bring the vector store up to date with the vault.
 
-    def _iter_documents(self) -> Iterable[DocumentChunk]:
-        if not self.vault_path.exists():
-            return []
-        for path in self.vault_path.rglob("*"):
-            if not path.is_file():
-                continue
-            if path.suffix.lower() not in SUPPORTED_EXTENSIONS:
+        Only new or modified files are extracted and embedded, and vectors of
+        deleted files are removed. Indexing is serialised so concurrent callers
+        never embed the same files twice; queries do not take the lock and keep
+        serving the existing index.
+        """
+        with self._index_lock, stage("rag.sync"):
+            return self._sync_vault()
+
+    def _sync_vault(self) -> SyncReport:
+        started = time.perf_counter()
+        report = SyncReport()
+        stale = self.manifest.stale_sources
+        if stale:
+            self.answer_cache.clear()
+        for start in range(0, len(stale), SOURCE_DELETE_BATCH):
+            # Indexed with different settings: drop the old vectors before re-indexing.
+            self.collection.delete(where={"source": {"$in": stale[start : start + SOURCE_DELETE_BATCH]}})
+        self.lexical.delete_sources(stale)
+        self.manifest.stale_sources = []
+        if self.manifest.expects_chunks() and (self.collection.count() == 0 or self.lexical.count() == 0):
+            # One of the stores was wiped; everything has to be indexed again. Files
+            # that yield no chunks (blank notes, image-only PDFs) never count as a wipe.
+            self.manifest.clear()
+        if self.vault_path.exists():
+            changes, removed, report.unchanged = self.manifest.diff(self.vault_path, SUPPORTED_EXTENSIONS)
+        else:
+            changes, removed = [], list(self.manifest.records)
+
+        released: set[str] = set()
+        jobs: list[ExtractionJob] = []
+        pending: dict[str, tuple[FileChange, FileRecord]] = {}
+        for change in changes:
+            path = self.vault_path / change.path
+            try:
+                digest = file_digest(path)
+            except OSError as exc:
+                logger.warning("Cannot read %s: %s", change.path, exc)
+                report.failed += 1
+                report.errors[change.path] = str(exc)
                 continue
-            content = self._load_content(path)
-            if not content:
+            record = FileRecord(change.path, change.size, change.mtime_ns, digest)
+            if change.previous and change.previous.sha256 == digest:
+                record.chunks = change.previous.chunks
+                # Touched but not modified: refresh the stat fingerprint only.
+                report.unchanged += 1
+                self.manifest.put(record)
                 continue
-            yield DocumentChunk(source=str(path.relative_to(self.vault_path)), content=content)
+            if change.previous:
+                released.add(change.previous.sha256)
+            pending[change.path] = (change, record)
+            jobs.append(ExtractionJob(change.path, path, digest))
+
+        batch = _PendingBatch()
+        try:
+            for result in self.extractor.run(jobs):
+                change, record = pending[result.job.source]
+                if result.error:
+                    logger.warning("Failed to extract %s: %s", change.path, result.error)
+                    report.failed += 1
+                    report.errors[change.path] = result.error
+                    continue
+                markdown = change.path.lower().endswith(".md")
+                metadata = vault_document_metadata(
+                    change.path, record.mtime_ns, result.pages[0] if markdown and result.pages else None
+                )
+                chunks = chunk_document(change.path, result.pages, markdown=markdown, metadata=metadata)
+                record.chunks = len(chunks)
+                batch.chunks.extend(chunks)
+                batch.documents[change.path] = metadata
+                batch.records.append(record)
+                report.indexed.append(change.path)
+                if change.previous:
+                    batch.replaced.append(change.path)
+                    report.updated += 1
+                else:
+                    report.added += 1
+                if len(batch.chunks) >= EMBED_BATCH_SIZE:
+                    self._flush(batch)
+                    batch = _PendingBatch()
+            self._flush(batch)
+
+            for start in range(0, len(removed), SOURCE_DELETE_BATCH):
+                sources = removed[start : start + SOURCE_DELETE_BATCH]
+                self.collection.delete(where={"source": {"$in": sources}})
+                self.lexical.delete_sources(sources)
+                self.answer_cache.invalidate_tags(sources)
+                for source in sources:
+                    previous = self.manifest.get(source)
+                    if previous:
+                        released.add(previous.sha256)
+                    self.manifest.remove(source)
+                report.removed += len(sources)
+        finally:
+            self.manifest.save()
 
-    def _load_content(self, path: Path) -> str:
-        if path.suffix.lower() == ".pdf":
-            reader = PdfReader(str(path))
-            return "\n".join(page.extract_text() or "" for page in reader.pages)
-        return path.read_text(encoding="utf-8", errors="ignore")
+        # Drop cached extractions that no indexed file refers to any more.
+        for digest in released - {record.sha256 for record in self.manifest.records.values()}:
+            self.extraction_cache.discard(digest)
+        report.duration = time.perf_counter() - started
+        if report.changed or report.failed:
+            logger.info("Vault sync: %s", report.as_dict())
+        return report
 
-    def query(self, question: str, top_k: int = 4) -> tuple[str, list[dict[str, str]]]:
+    def index_documents(
+        self, documents: dict[str, str], metadata: dict[str, DocumentMetadata] | None = None
+    ) -> None:
+        """Index or replace documents that do not live in the vault (e.g. notes), keyed by source."""
+        if not documents:
+            return
+        metadata = metadata or {}
+        batch = _PendingBatch(replaced=list(documents), documents=metadata)
+        for source, text in documents.items():
+            batch.chunks.extend(chunk_document(source, [text], markdown=True, metadata=metadata.get(source)))
+        with self._index_lock:
+            self._flush(batch)
+
+    def remove_documents(self, sources: list[str]) -> None:
+        if not sources:
+            return
+        with self._index_lock:
+            for start in range(0, len(sources), SOURCE_DELETE_BATCH):
+                self.collection.delete(where={"source": {"$in": sources[start : start + SOURCE_DELETE_BATCH]}})
+            self.lexical.delete_sources(sources)
+            self.answer_cache.invalidate_tags(sources)
+
+    def _flush(self, batch: _PendingBatch) -> None:
+        with stage("rag.flush"):
+            self._write_batch(batch)
+
+    def _write_batch(self, batch: _PendingBatch) -> None:
+        if batch.replaced:
+            self.collection.delete(where={"source": {"$in": batch.replaced}})
+            self.lexical.delete_sources(batch.replaced)
+            self.answer_cache.invalidate_tags(batch.replaced)
+        for start in range(0, len(batch.chunks), EMBED_BATCH_SIZE):
+            chunks = batch.chunks[start : start + EMBED_BATCH_SIZE]
+            self.collection.upsert(
+                documents=[chunk.content for chunk in chunks],
+                embeddings=self.embedder.embed_documents([chunk.content for chunk in chunks]),
+                ids=[chunk.id for chunk in chunks],
+                metadatas=[chunk.metadata() for chunk in chunks],
+            )
+        self.lexical.upsert((chunk.id, chunk.source, chunk.page, chunk.offset, chunk.content) for chunk in batch.chunks)
+        self.lexical.put_documents(batch.documents)
+        for record in batch.records:
+            self.manifest.put(record)
+
+    def retrieve(
+        self,
+        question: str,
+        top_k: int = 4,
+        mode: str = DEFAULT_SEARCH_MODE,
+        filters: SearchFilter | None = None,
+    ) -> tuple[list[Passage], list[dict[str, object]]]:
+        """Return the passages most relevant to ``question``, best first, and their source entries.
+
+        ``mode`` selects vector search, BM25 lexical search, or both merged with
+        reciprocal-rank fusion (``hybrid``). Lexical mode never computes an embedding.
+        ``filters`` are applied inside both stores, before ranking.
+        """
         if not question.strip():
             raise ValueError("Question cannot be empty")
-        results = self.collection.query(query_texts=[question], n_results=top_k)
-        documents = results.get("documents") or [[]]
-        metadatas = results.get("metadatas") or [[]]
-        documents = documents[0] if documents else []
-        metadatas = metadatas[0] if metadatas else []
-        if not documents:
-            return ("I could not find relevant information in the vault.", [])
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode '{mode}'")
+        with stage("rag.retrieve"):
+            return self._retrieve(question, top_k, mode, filters or None)
+
+    def _retrieve(
+        self, question: str, top_k: int, mode: str, filters: SearchFilter | None
+    ) -> tuple[list[Passage], list[dict[str, object]]]:
+        if mode == "vector":
+            hits = self._vector_search(question, top_k, filters)
+        elif mode == "lexical":
+            hits = self._lexical_search(question, top_k, filters)
+        else:
+            depth = top_k * HYBRID_CANDIDATES
+            # Copy the context so both searches still report into the request's stage breakdown.
+            vector = self._search_pool.submit(
+                contextvars.copy_context().run, self._vector_search, question, depth, filters
+            )
+            lexical = self._search_pool.submit(
+                contextvars.copy_context().run, self._lexical_search, question, depth, filters
+            )
+            hits = fuse_rankings([vector.result(), lexical.result()], top_k)
+
+        contents = []
         sources = []
-        for content, metadata in zip(documents, metadatas):
+        for hit in hits:
+            content = str(hit["content"] or "")
             if not content:
                 continue
-            metadata = metadata or {}
-            sources.append({"source": metadata.get("source"), "snippet": content[:280]})
-        answer = self.llm.answer(question, documents)
+            metadata = hit["metadata"] or {}
+            label = str(metadata.get("source"))
+            if metadata.get("page") is not None:
+                label += f" (p. {metadata['page']})"
+            contents.append(Passage(content=content, label=label))
+            sources.append(
+                {
+                    "source": metadata.get("source"),
+                    "chunk_id": hit["id"],
+                    "page": metadata.get("page"),
+                    "offset": metadata.get("offset"),
+                    "snippet": content[:280],
+                }
+            )
+        return contents, sources
+
+    def _lexical_search(
+        self, question: str, limit: int, filters: SearchFilter | None = None
+    ) -> list[dict[str, object]]:
+        with stage("rag.lexical_search"):
+            return self.lexical.search(question, limit, filters)
+
+    def _vector_search(
+        self, question: str, limit: int, filters: SearchFilter | None = None
+    ) -> list[dict[str, object]]:
+        embedding = self.embedder.embed_query(question)
+        where = filters.chroma_where() if filters else None
+        with stage("rag.vector_search"):
+            results = self.collection.query(query_embeddings=[embedding], n_results=limit, where=where)
+        ids = (results.get("ids") or [[]])[0]
+        documents = (results.get("documents") or [[]])[0]
+        metadatas = (results.get("metadatas") or [[]])[0]
+        return [
+            {"id": chunk_id, "content": content, "metadata": metadata}
+            for chunk_id, content, metadata in zip(ids, documents, metadatas)
+        ]
+
+    def query(
+        self,
+        question: str,
+        top_k: int = 4,
+        mode: str = DEFAULT_SEARCH_MODE,
+        filters: SearchFilter | None = None,
+    ) -> tuple[str, list[dict[str, object]]]:
+        documents, sources = self.retrieve(question, top_k=top_k, mode=mode, filters=filters)
+        if not documents:
+            return (NO_RESULTS_ANSWER, [])
+        key = self.answer_key(question, sources, top_k)
+        answer = self.answer_cache.get(key)
+        if answer is None:
+            answer = self.llm.answer(question, documents)
+            self.answer_cache.set(key, answer, tags=[str(source["source"]) for source in sources])
         return answer, sources
+
+    async def aquery(
+        self,
+        question: str,
+        top_k: int = 4,
+        mode: str = DEFAULT_SEARCH_MODE,
+        filters: SearchFilter | None = None,
+    ) -> tuple[str, list[dict[str, object]]]:
+        """Async variant of :meth:`query`: retrieval runs in a worker thread, the completion on the loop."""
+        documents, sources = await asyncio.to_thread(self.retrieve, question, top_k, mode, filters)
+        if not documents:
+            return (NO_RESULTS_ANSWER, [])
+        key = self.answer_key(question, sources, top_k)
+        answer = self.answer_cache.get(key)
+        if answer is None:
+            answer = await self.llm.aanswer(question, documents)
+            self.answer_cache.set(key, answer, tags=[str(source["source"]) for source in sources])
+        return answer, sources
+
+    async def astream_query(
+        self,
+        question: str,
+        top_k: int = 4,
+        mode: str = DEFAULT_SEARCH_MODE,
+        filters: SearchFilter | None = None,
+    ) -> tuple[list[dict[str, object]], AsyncIterator[str]]:
+        """Retrieve sources up front and return them with an async iterator over answer pieces."""
+        documents, sources = await asyncio.to_thread(self.retrieve, question, top_k, mode, filters)
+        if not documents:
+            return [], _aiter_once(NO_RESULTS_ANSWER)
+        key = self.answer_key(question, sources, top_k)
+        cached = self.answer_cache.get(key)
+        if cached is not None:
+            return sources, _aiter_once(cached)
+        return sources, self._astream_and_cache(key, question, documents, sources)
+
+    async def _astream_and_cache(
+        self,
+        key: str,
+        question: str,
+        documents: list[Passage],
+        sources: list[dict[str, object]],
+    ) -> AsyncIterator[str]:
+        pieces = []
+        async for piece in self.llm.astream_answer(question, documents):
+            pieces.append(piece)
+            yield piece
+        # Only complete answers are cached; an aborted stream never reaches this point.
+        self.answer_cache.set(key, "".join(pieces), tags=[str(source["source"]) for source in sources])
+
+    def answer_key(self, question: str, sources: list[dict[str, object]], top_k: int) -> str:
+        """Cache key for an answer: chunk ids embed content hashes, so edits change the key."""
+        normalized = " ".join(question.lower().split()).rstrip("?!. ")
+        parts = [normalized, str(top_k), self.llm.model, *(str(source["chunk_id"]) for source in sources)]
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+async def _aiter_once(text: str) -> AsyncIterator[str]:
+    yield text
+
+
+_rag_service_lock = threading.Lock()
+
+
+def get_rag_service() -> RAGService:
+    """Return the process-wide RAG engine shared by every request.
+
+    It is built on first use (or by the start-up warm-up); callers arriving
+    meanwhile wait for that one instance instead of loading a second one.
+    """
+    with _rag_service_lock:
+        return _build_rag_service()
+
+
+@lru_cache
+def _build_rag_service() -> RAGService:
+    return RAGService()
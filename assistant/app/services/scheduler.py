@@ -1,20 +1,54 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timedelta
-from typing import Callable
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any
 
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.date import DateTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from fastapi import Depends
-from sqlmodel import Session
+from sqlmodel import Session, or_, select
 
-from ..deps import engine, get_scheduler, get_session
-from ..models import Note, Task
+from ..deps import SCHEDULER_MISFIRE_GRACE, engine, get_scheduler, get_session
+from ..models import Note, Task, next_reminder_at, parse_recurrence
 from ..utils.timeparse import parse_when
+from .briefing import invalidate_briefing
+from .notifications import get_notification_dispatcher
 
 logger = logging.getLogger(__name__)
 
+# Task reminders live in the in-memory store and are rebuilt from the Task table
+# on start; note pings go to the durable store and must reference a module-level
+# callable so they can be pickled.
+TASK_JOBSTORE = "memory"
+NOTE_JOBSTORE = "default"
+TASK_JOB_SUFFIXES = ("-once", "-recurring", "-catchup")
+
+# "jobs" registers one APScheduler job per task; "sweeper" runs a single periodic
+# query over the indexed Task.next_reminder_at column instead.
+REMINDER_MODE = os.getenv("REMINDER_MODE", "jobs").lower()
+REMINDER_SWEEP_INTERVAL = int(os.getenv("REMINDER_SWEEP_INTERVAL", "30"))
+REMINDER_SWEEP_BATCH = int(os.getenv("REMINDER_SWEEP_BATCH", "1000"))
+
+
+def send_notification(title: str, body: str, key: str | None = None) -> None:
+    # Only enqueues: delivery happens on the dispatcher's own worker threads.
+    get_notification_dispatcher().notify(title, body, key)
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc)
+
+
+@lru_cache(maxsize=1024)
+def _first_fire(trigger: CronTrigger, since: datetime) -> datetime | None:
+    # Most open tasks share a preset trigger and the same grace window start.
+    return trigger.get_next_fire_time(None, _as_utc(since))
+
 
 class SchedulerService:
     def __init__(self, scheduler=None) -> None:
@@ -31,54 +65,181 @@ class SchedulerService:
         if not run_at:
             return
         self.scheduler.add_job(
-            func=self._notify,
+            func=f"{__name__}:send_notification",
             trigger=DateTrigger(run_date=run_at),
             args=[f"Reminder from note '{note.title}'", note.content],
             id=f"note-{note.id}-{run_at.timestamp()}",
+            jobstore=NOTE_JOBSTORE,
             replace_existing=True,
         )
         logger.info("Scheduled reminder for note %s at %s", note.id, run_at)
 
     def sync_task(self, task: Task) -> None:
         self.cancel_task(task.id)
-        if task.completed:
+        if task.completed or REMINDER_MODE == "sweeper":
+            # In sweeper mode the flush already stored next_reminder_at.
             return
-        next_run = None
+        for job in self._task_jobs(task, datetime.utcnow()):
+            self.scheduler.add_job(**job)
+            logger.info("Scheduled task %s reminder %s with trigger %s", task.id, job["id"], job["trigger"])
+
+    def sync_tasks(self, tasks: list[Task]) -> int:
+        """Schedule reminders for many newly created tasks in one pass."""
+        if REMINDER_MODE == "sweeper":
+            return 0
+        now = datetime.utcnow()
+        jobs = [job for task in tasks if not task.completed for job in self._task_jobs(task, now)]
+        for job in jobs:
+            self.scheduler.add_job(**job)
+        if jobs:
+            logger.info("Scheduled %d reminders for %d tasks", len(jobs), len(tasks))
+        return len(jobs)
+
+    def rehydrate(self, grace: int = SCHEDULER_MISFIRE_GRACE) -> int:
+        """Re-create reminders for every open task after a restart.
+
+        All candidate tasks are loaded in one column-only query. Reminders missed
+        while the process was down are delivered once (coalesced) if they are at
+        most ``grace`` seconds late, and dropped otherwise.
+        """
+        if REMINDER_MODE == "sweeper":
+            return self.start_sweeper()
+        started = time.perf_counter()
+        now = datetime.utcnow()
+        with Session(engine) as session:
+            rows = session.exec(
+                select(
+                    Task.id,
+                    Task.due_date,
+                    Task.reminder_offset,
+                    Task.recurrence,
+                    Task.last_reminded_at,
+                    Task.created_at,
+                ).where(
+                    Task.completed == False,  # noqa: E712
+                    or_(Task.due_date.is_not(None), Task.recurrence.is_not(None)),
+                )
+            ).all()
+        jobs = [job for row in rows for job in self._task_jobs(row, now, grace=grace)]
+        for job in jobs:
+            self.scheduler.add_job(**job)
+        catch_up = sum(1 for job in jobs if job["id"].endswith("-catchup"))
+        logger.info(
+            "Rehydrated %d reminders for %d open tasks (%d missed during downtime) in %.2fs",
+            len(jobs),
+            len(rows),
+            catch_up,
+            time.perf_counter() - started,
+        )
+        return len(jobs)
+
+    def start_sweeper(self) -> int:
+        """Fill in ``next_reminder_at`` for rows that predate it and register the sweeper."""
+        now = datetime.utcnow()
+        with Session(engine) as session:
+            tasks = session.exec(
+                select(Task).where(
+                    Task.completed == False,  # noqa: E712
+                    Task.next_reminder_at.is_(None),
+                    or_(Task.due_date.is_not(None), Task.recurrence.is_not(None)),
+                )
+            ).all()
+            for task in tasks:
+                task.next_reminder_at = next_reminder_at(task, now)
+            session.commit()
+        self.scheduler.add_job(
+            self.sweep,
+            IntervalTrigger(seconds=REMINDER_SWEEP_INTERVAL),
+            id="reminder-sweeper",
+            jobstore=TASK_JOBSTORE,
+            replace_existing=True,
+            next_run_time=datetime.now(timezone.utc),
+        )
+        logger.info("Reminder sweeper every %ss (%d tasks backfilled)", REMINDER_SWEEP_INTERVAL, len(tasks))
+        return len(tasks)
+
+    def sweep(self) -> int:
+        """Dispatch every due reminder, advancing each batch of rows in one transaction.
+
+        Reminders more than ``SCHEDULER_MISFIRE_GRACE`` seconds late (e.g. after
+        downtime) are skipped but still advanced.
+        """
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=SCHEDULER_MISFIRE_GRACE)
+        sent = skipped = 0
+        while True:
+            with Session(engine) as session:
+                due = session.exec(
+                    select(Task)
+                    .where(Task.next_reminder_at <= now, Task.completed == False)  # noqa: E712
+                    .order_by(Task.next_reminder_at)
+                    .limit(REMINDER_SWEEP_BATCH)
+                ).all()
+                for task in due:
+                    if task.next_reminder_at >= cutoff:
+                        self._notify(f"Task reminder: {task.title}", task.description or "", key=f"task:{task.id}")
+                        task.last_reminded_at = now
+                        sent += 1
+                    else:
+                        skipped += 1
+                    task.next_reminder_at = next_reminder_at(task, now)
+                session.commit()
+            if len(due) < REMINDER_SWEEP_BATCH:
+                break
+        if sent or skipped:
+            invalidate_briefing()
+            logger.info("Sweeper sent %d reminders (%d skipped as too late)", sent, skipped)
+        return sent
+
+    def _task_jobs(self, task: Any, now: datetime, grace: int = 0) -> list[dict[str, Any]]:
+        """Plan the scheduler jobs for a task (or a row with the same attributes).
+
+        A future one-shot reminder wins over recurrence. With ``grace`` set, a
+        one-shot or recurring reminder that fell due within the last ``grace``
+        seconds and was not yet sent is added as a single immediate catch-up job.
+        Fire times before the task was created never count as missed.
+        """
+        jobs: list[dict[str, Any]] = []
+        run_time = None
         if task.due_date:
             run_time = task.due_date
             if task.reminder_offset:
                 run_time = run_time - timedelta(minutes=task.reminder_offset)
-            if run_time > datetime.utcnow():
-                next_run = run_time
-        if not next_run and task.recurrence:
-            trigger = self._parse_recurrence(task.recurrence)
-            if trigger:
-                job_id = f"task-{task.id}-recurring"
-                self.scheduler.add_job(
-                    func=self._notify_task,
-                    trigger=trigger,
-                    args=[task.id],
-                    id=job_id,
-                    replace_existing=True,
-                )
-                logger.info("Scheduled recurring task %s with trigger %s", task.id, trigger)
-            return
-        if next_run:
-            job_id = f"task-{task.id}-once"
-            self.scheduler.add_job(
-                func=self._notify_task,
-                trigger=DateTrigger(run_date=next_run),
-                args=[task.id],
-                id=job_id,
-                replace_existing=True,
+        if run_time and run_time > now:
+            jobs.append(self._job(task.id, "-once", DateTrigger(run_date=run_time)))
+            return jobs
+        trigger = parse_recurrence(task.recurrence) if task.recurrence else None
+        if trigger:
+            jobs.append(self._job(task.id, "-recurring", trigger))
+        if grace:
+            since = max(
+                moment
+                for moment in (now - timedelta(seconds=grace), task.created_at, task.last_reminded_at)
+                if moment is not None
             )
-            logger.info("Scheduled one-shot task %s at %s", task.id, next_run)
+            missed = bool(run_time and since <= run_time <= now)
+            if not missed and trigger:
+                fire_time = _first_fire(trigger, since)
+                missed = fire_time is not None and fire_time <= _as_utc(now)
+            if missed:
+                jobs.append(self._job(task.id, "-catchup", DateTrigger()))
+        return jobs
+
+    def _job(self, task_id: int, suffix: str, trigger: Any) -> dict[str, Any]:
+        return {
+            "func": self._notify_task,
+            "trigger": trigger,
+            "args": [task_id],
+            "id": f"task-{task_id}{suffix}",
+            "jobstore": TASK_JOBSTORE,
+            "replace_existing": True,
+        }
 
     def cancel_task(self, task_id: int) -> None:
-        for suffix in ("-once", "-recurring"):
+        for suffix in TASK_JOB_SUFFIXES:
             job_id = f"task-{task_id}{suffix}"
             try:
-                self.scheduler.remove_job(job_id)
+                self.scheduler.remove_job(job_id, jobstore=TASK_JOBSTORE)
             except Exception:
                 continue
 
@@ -88,26 +249,14 @@ class SchedulerService:
             if not task:
                 logger.warning("Task %s not found for notification", task_id)
                 return
-            self._notify(f"Task reminder: {task.title}", task.description or "")
+            self._notify(f"Task reminder: {task.title}", task.description or "", key=f"task:{task_id}")
             task.last_reminded_at = datetime.utcnow()
             session.add(task)
             session.commit()
+        invalidate_briefing()
 
-    def _notify(self, title: str, body: str) -> None:
-        logger.info("[NOTIFY] %s - %s", title, body)
-        print(f"\n🔔 {title}: {body}\n", flush=True)
+    def _notify(self, title: str, body: str, key: str | None = None) -> None:
+        send_notification(title, body, key)
 
     def _parse_recurrence(self, recurrence: str) -> CronTrigger | None:
-        recurrence = recurrence.strip().lower()
-        presets = {
-            "daily": CronTrigger(hour=9),
-            "weekly": CronTrigger(day_of_week="mon", hour=9),
-            "weekdays": CronTrigger(day_of_week="mon-fri", hour=9),
-        }
-        if recurrence in presets:
-            return presets[recurrence]
-        try:
-            return CronTrigger.from_crontab(recurrence)
-        except ValueError:
-            logger.warning("Invalid recurrence pattern '%s'", recurrence)
-            return None
+        return parse_recurrence(recurrence)
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete
+from sqlmodel import Session, SQLModel, select
+
+from ..deps import WRITE_LOCK_WAIT_SECONDS, engine
+from ..models import Note, Task, Tombstone
+from ..utils.pagination import decode_cursor, encode_cursor, keyset_after
+
+logger = logging.getLogger(__name__)
+
+# Rows younger than this are held back: a transaction that stamped updated_at
+# earlier but commits later must not slip behind a cursor already handed out.
+# Such a commit may first wait out the whole busy timeout, so the window must
+# be longer than that (see check_settle_window).
+SYNC_SETTLE_SECONDS = float(os.getenv("SYNC_SETTLE_SECONDS", str(WRITE_LOCK_WAIT_SECONDS + 2)))
+TOMBSTONE_RETENTION_DAYS = int(os.getenv("SYNC_TOMBSTONE_DAYS", "30"))
+
+# One (timestamp, id) keyset per stream, flattened into a single cursor.
+STREAMS: list[tuple[str, type[SQLModel], Any]] = [
+    ("notes", Note, Note.updated_at),
+    ("tasks", Task, Task.updated_at),
+    ("deleted", Tombstone, Tombstone.deleted_at),
+]
+SYNC_ORDERING = [pair for _, model, stamp in STREAMS for pair in ((stamp, False), (model.id, False))]
+
+
+class CursorExpired(Exception):
+    """The cursor predates retained tombstones; the client must resync from scratch."""
+
+
+def check_settle_window() -> None:
+    """Refuse to run with a settle window that a lock wait can outlast."""
+    if SYNC_SETTLE_SECONDS <= WRITE_LOCK_WAIT_SECONDS:
+        raise RuntimeError(
+            f"SYNC_SETTLE_SECONDS ({SYNC_SETTLE_SECONDS:g}) must exceed the SQLite busy timeout "
+            f"({WRITE_LOCK_WAIT_SECONDS:g}s), or delta sync can skip late commits"
+        )
+
+
+def record_deletion(session: Session, kind: str, item_id: int) -> None:
+    """Add a tombstone to the caller's transaction."""
+    session.add(Tombstone(kind=kind, item_id=item_id))
+
+
+def changes_since(session: Session, cursor: str | None, limit: int) -> dict[str, Any]:
+    """Notes, tasks and deletions after ``cursor``, at most ``limit`` of each.
+
+    Without a cursor every note and task is returned and deletions start from
+    now. Keep calling with the returned cursor while ``has_more`` is true.
+    """
+    horizon = datetime.utcnow() - timedelta(seconds=SYNC_SETTLE_SECONDS)
+    if cursor:
+        positions = decode_cursor(cursor, SYNC_ORDERING)
+        deleted_at = positions[4]
+        if deleted_at is not None and deleted_at < horizon - timedelta(days=TOMBSTONE_RETENTION_DAYS):
+            raise CursorExpired
+    else:
+        positions = [None] * len(SYNC_ORDERING)
+        latest = session.exec(
+            select(Tombstone.deleted_at, Tombstone.id)
+            .where(Tombstone.deleted_at <= horizon)
+            .order_by(Tombstone.deleted_at.desc(), Tombstone.id.desc())
+            .limit(1)
+        ).first()
+        positions[4:6] = list(latest) if latest else [horizon, 0]
+    result: dict[str, Any] = {"has_more": False}
+    for index, (name, model, stamp) in enumerate(STREAMS):
+        ordering = SYNC_ORDERING[2 * index : 2 * index + 2]
+        position = positions[2 * index : 2 * index + 2]
+        statement = select(model).where(stamp <= horizon)
+        if position[0] is not None:
+            statement = statement.where(keyset_after(ordering, position))
+        rows = session.exec(statement.order_by(stamp, model.id).limit(limit + 1)).all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            result["has_more"] = True
+        if rows:
+            positions[2 * index : 2 * index + 2] = [getattr(rows[-1], stamp.key), rows[-1].id]
+        else:
+            # Nothing up to the horizon is left, so an idle stream can move forward
+            # (which keeps quiet clients from looking expired).
+            positions[2 * index : 2 * index + 2] = [horizon, 0]
+        result[name] = rows
+    result["deleted"] = [
+        {"kind": row.kind, "id": row.item_id, "deleted_at": row.deleted_at} for row in result["deleted"]
+    ]
+    result["cursor"] = encode_cursor(positions)
+    return jsonable_encoder(result)
+
+
+def prune_tombstones() -> int:
+    cutoff = datetime.utcnow() - timedelta(days=TOMBSTONE_RETENTION_DAYS)
+    with Session(engine) as session:
+        removed = session.exec(delete(Tombstone).where(Tombstone.deleted_at < cutoff)).rowcount
+        session.commit()
+    if removed:
+        logger.info("Pruned %d tombstones older than %s", removed, cutoff)
+    return removed
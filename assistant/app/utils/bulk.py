@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Iterator, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "500"))
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "50000"))
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def parse_items(raw: bytes) -> tuple[list[tuple[int, Any]], list[dict[str, Any]]]:
+    """Split a bulk body (a JSON array or NDJSON) into ``(index, item)`` pairs.
+
+    Malformed NDJSON lines are reported as errors for their index instead of
+    rejecting the whole body; a malformed JSON array raises ``ValueError``.
+    """
+    text = raw.decode("utf-8").strip()
+    if not text:
+        return [], []
+    if text.startswith("["):
+        try:
+            items = json.loads(text)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Invalid JSON array: {exc}") from exc
+        return list(enumerate(items)), []
+    parsed: list[tuple[int, Any]] = []
+    errors: list[dict[str, Any]] = []
+    for index, line in enumerate(line for line in text.splitlines() if line.strip()):
+        try:
+            parsed.append((index, json.loads(line)))
+        except json.JSONDecodeError as exc:
+            errors.append({"index": index, "error": f"Invalid JSON: {exc.msg}"})
+    return parsed, errors
+
+
+def validate_items(
+    items: list[tuple[int, Any]], model: type[ModelT]
+) -> tuple[list[tuple[int, ModelT]], list[dict[str, Any]]]:
+    valid: list[tuple[int, ModelT]] = []
+    errors: list[dict[str, Any]] = []
+    for index, item in items:
+        try:
+            valid.append((index, model.model_validate(item)))
+        except ValidationError as exc:
+            details = [{"loc": list(error["loc"]), "msg": error["msg"]} for error in exc.errors()]
+            errors.append({"index": index, "error": details})
+    return valid, errors
+
+
+def chunked(items: list[Any], size: int = BULK_CHUNK_SIZE) -> Iterator[list[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
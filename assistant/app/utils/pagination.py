@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Sequence
+
+from sqlalchemy import and_, false, literal, or_
+from sqlalchemy.sql.elements import ColumnElement
+from sqlmodel import Session, SQLModel, select
+
+# Ordering is expressed as ``(column, descending)`` pairs. Ascending columns sort
+# NULLs first and descending ones NULLs last, which is SQLite's native order, so
+# the same keyset predicate is correct on other databases too.
+Ordering = Sequence[tuple[Any, bool]]
+
+
+def order_clauses(ordering: Ordering) -> list[Any]:
+    return [column.desc().nulls_last() if descending else column.asc().nulls_first() for column, descending in ordering]
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, ordering: Ordering) -> list[Any]:
+    """Decode a cursor produced by :func:`encode_cursor`; raises ``ValueError`` if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(values, list) or len(values) != len(ordering):
+        raise ValueError("Invalid cursor")
+    decoded = []
+    for value, (column, _) in zip(values, ordering):
+        if value is not None:
+            expected = column.type.python_type
+            if expected is datetime:
+                if not isinstance(value, str):
+                    raise ValueError("Invalid cursor")
+                try:
+                    value = datetime.fromisoformat(value)
+                except (TypeError, ValueError) as exc:
+                    raise ValueError("Invalid cursor") from exc
+            elif not isinstance(value, expected):
+                raise ValueError("Invalid cursor")
+        decoded.append(value)
+    return decoded
+
+
+def _after(column: Any, value: Any, descending: bool) -> ColumnElement:
+    if descending:
+        return false() if value is None else or_(column < literal(value, column.type), column.is_(None))
+    return column.is_not(None) if value is None else column > literal(value, column.type)
+
+
+def _equal(column: Any, value: Any) -> ColumnElement:
+    return column.is_(None) if value is None else column == literal(value, column.type)
+
+
+def keyset_after(ordering: Ordering, values: Sequence[Any]) -> ColumnElement:
+    """Predicate selecting rows that sort strictly after ``values`` in ``ordering``."""
+    clauses = []
+    for index, (column, descending) in enumerate(ordering):
+        prefix = [_equal(previous, values[position]) for position, (previous, _) in enumerate(ordering[:index])]
+        clauses.append(and_(*prefix, _after(column, values[index], descending)))
+    return or_(*clauses)
+
+
+def parse_fields(fields: str | None, allowed: Sequence[str]) -> list[str] | None:
+    """Parse a ``fields=a,b`` projection; raises ``ValueError`` for unknown names."""
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(names))
+
+
+def paginate(
+    session: Session,
+    model: type[SQLModel],
+    ordering: Ordering,
+    filters: list[Any],
+    limit: int,
+    cursor: str | None = None,
+    fields: list[str] | None = None,
+) -> tuple[list[Any], str | None]:
+    """Fetch one keyset page of ``model`` rows.
+
+    Returns model instances, or plain dicts of ``fields`` when a projection is
+    requested, plus the cursor of the next page (``None`` on the last page).
+    """
+    filters = list(filters)
+    if cursor:
+        filters.append(keyset_after(ordering, decode_cursor(cursor, ordering)))
+    keys = [column for column, _ in ordering]
+    if fields is None:
+        statement = select(model)
+    else:
+        statement = select(*(getattr(model, name) for name in fields), *keys)
+    statement = statement.where(*filters).order_by(*order_clauses(ordering)).limit(limit + 1)
+    rows = session.exec(statement).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if fields is None:
+        items = list(rows)
+        last_key = [getattr(rows[-1], column.key) for column in keys] if rows else []
+    else:
+        items = [dict(zip(fields, row)) for row in rows]
+        last_key = list(rows[-1][len(fields) :]) if rows else []
+    return items, encode_cursor(last_key) if has_more else None
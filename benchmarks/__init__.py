@@ -0,0 +1 @@
+"""Offline benchmarks for the assistant's hot paths; run with ``python -m benchmarks.run``."""
@@ -0,0 +1,69 @@
+"""Compare two benchmark result files and flag regressions.
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 0.1
+
+Exits with status 1 if any shared benchmark's p50 or p95 grew by more than the
+threshold (a fraction, 0.1 = 10%).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms")
+GATED = ("p50_ms", "p95_ms")
+
+
+def _change(before: float | None, after: float | None) -> float | None:
+    if before in (None, 0) or after is None:
+        return None
+    return (after - before) / before
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> tuple[list[list[str]], list[str]]:
+    rows: list[list[str]] = []
+    regressions: list[str] = []
+    before_results = baseline.get("results", {})
+    after_results = candidate.get("results", {})
+    for name in sorted(set(before_results) & set(after_results)):
+        row = [name]
+        for metric in METRICS:
+            before = before_results[name].get(metric)
+            after = after_results[name].get(metric)
+            change = _change(before, after)
+            row.append(f"{before} -> {after}" + (f" ({change:+.1%})" if change is not None else ""))
+            if metric in GATED and change is not None and change > threshold:
+                regressions.append(f"{name} {metric} {change:+.1%}")
+        rows.append(row)
+    return rows, regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+    baseline = json.loads(args.baseline.read_text())
+    candidate = json.loads(args.candidate.read_text())
+    rows, regressions = compare(baseline, candidate, args.threshold)
+    header = ["benchmark", *METRICS]
+    widths = [max(len(str(cell)) for cell in column) for column in zip(header, *rows)]
+    for row in [header, *rows]:
+        print("  ".join(str(cell).ljust(width) for cell, width in zip(row, widths)))
+    only = set(baseline.get("results", {})) ^ set(candidate.get("results", {}))
+    if only:
+        print(f"\nNot in both runs: {', '.join(sorted(only))}")
+    if regressions:
+        print(f"\nRegressions above {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+
+from assistant.app.models import Note, Task, next_reminder_at
+
+WORDS = (
+    "project meeting budget report deadline review client design launch roadmap invoice travel "
+    "research draft summary feedback hiring onboarding quarterly metrics revenue pipeline backlog "
+    "release testing migration database server latency cache index query vault markdown notes "
+    "garden recipe workout reading journal family birthday insurance taxes renovation holiday"
+).split()
+INSERT_BATCH = 10_000
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def paragraph(rng: random.Random, words: int) -> str:
+    sentences = []
+    while words > 0:
+        length = min(words, rng.randint(8, 20))
+        sentences.append(sentence(rng, length))
+        words -= length
+    return " ".join(sentences)
+
+
+def make_pdf(pages: list[str]) -> bytes:
+    """Smallest useful PDF: one Helvetica text line per page, enough for pypdf to extract."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for index, text in enumerate(pages):
+        page_id = 4 + 2 * index
+        kids.append(f"{page_id} 0 R")
+        escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        stream = f"BT /F1 10 Tf 36 760 Td ({escaped}) Tj ET".encode("latin-1", "replace")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>".encode()
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return out
+
+
+def write_vault(
+    root: Path,
+    files: int,
+    words_per_file: int = 600,
+    pdf_pages: int = 4,
+    kinds: tuple[str, ...] = ("md", "txt", "pdf"),
+    seed: int = 7,
+) -> dict[str, int]:
+    """Generate ``files`` synthetic documents, cycling through ``kinds``."""
+    rng = random.Random(seed)
+    root.mkdir(parents=True, exist_ok=True)
+    counts = {kind: 0 for kind in kinds}
+    for index in range(files):
+        kind = kinds[index % len(kinds)]
+        path = root / f"doc-{index:05d}.{kind}"
+        if kind == "md":
+            sections = [
+                f"## {sentence(rng, 3)}\n\n{paragraph(rng, words_per_file // 4)}" for _ in range(4)
+            ]
+            path.write_text(f"# Document {index}\n\n" + "\n\n".join(sections), encoding="utf-8")
+        elif kind == "txt":
+            path.write_text(paragraph(rng, words_per_file), encoding="utf-8")
+        else:
+            path.write_bytes(make_pdf([paragraph(rng, words_per_file // pdf_pages) for _ in range(pdf_pages)]))
+        counts[kind] += 1
+    return counts
+
+
+def seed_database(engine: Engine, notes: int, tasks: int, seed: int = 7) -> None:
+    """Bulk-insert synthetic notes and tasks with Core ``executemany`` (1M rows in seconds)."""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    with engine.begin() as connection:
+        for start in range(0, notes, INSERT_BATCH):
+            rows = []
+            for index in range(start, min(notes, start + INSERT_BATCH)):
+                created = now - timedelta(minutes=notes - index)
+                rows.append(
+                    {
+                        "title": sentence(rng, 4),
+                        "content": paragraph(rng, 60),
+                        "created_at": created,
+                        "updated_at": created,
+                    }
+                )
+            connection.execute(insert(Note.__table__), rows)
+        for start in range(0, tasks, INSERT_BATCH):
+            rows = []
+            for index in range(start, min(tasks, start + INSERT_BATCH)):
+                created = now - timedelta(minutes=tasks - index)
+                rows.append(
+                    {
+                        "title": sentence(rng, 5),
+                        "description": sentence(rng, 12) if rng.random() < 0.5 else None,
+                        "due_date": now + timedelta(hours=rng.randint(-24 * 30, 24 * 30)) if rng.random() < 0.8 else None,
+                        "priority": rng.choice([None, 1, 2, 3]),
+                        "recurrence": rng.choice(["daily", "weekly", "weekdays"]) if rng.random() < 0.1 else None,
+                        "reminder_offset": rng.choice([None, 15, 60]),
+                        "created_at": created,
+                        "updated_at": created,
+                        "completed": rng.random() < 0.3,
+                    }
+                )
+                # Core inserts skip the ORM listeners that maintain this column.
+                rows[-1]["next_reminder_at"] = next_reminder_at(SimpleNamespace(**rows[-1]), now)
+            connection.execute(insert(Task.__table__), rows)
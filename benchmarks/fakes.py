@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from typing import Any, AsyncIterator, Iterable
+
+import numpy as np
+from chromadb.api.types import EmbeddingFunction
+
+from assistant.app.services.context import Passage
+from assistant.app.services.llm import LLMService
+
+
+class FakeEmbeddingFunction(EmbeddingFunction):
+    """Deterministic hashed bag-of-words vectors; no model download or network."""
+
+    def __init__(self, dimensions: int = 64) -> None:
+        self.dimensions = dimensions
+
+    def __call__(self, input: Any) -> Any:
+        vectors = []
+        for text in input:
+            vector = np.zeros(self.dimensions, dtype=np.float32)
+            for word in text.lower().split():
+                bucket = int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=4).digest(), "big")
+                vector[bucket % self.dimensions] += 1.0
+            norm = float(np.linalg.norm(vector)) or 1.0
+            vectors.append(vector / norm)
+        return vectors
+
+    @staticmethod
+    def name() -> str:
+        return "benchmark-fake"
+
+    def get_config(self) -> dict[str, Any]:
+        return {"dimensions": self.dimensions}
+
+    @staticmethod
+    def build_from_config(config: dict[str, Any]) -> "FakeEmbeddingFunction":
+        return FakeEmbeddingFunction(**config)
+
+
+class FakeLLM(LLMService):
+    """Answers from the packed context after a fixed delay instead of calling a model.
+
+    Context packing still runs, so prompt assembly stays part of the measurement.
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        super().__init__()
+        self.client = None
+        self.latency = latency
+
+    def answer(self, question: str, documents: Iterable[str | Passage]) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        return super().answer(question, documents)
+
+    async def aanswer(self, question: str, documents: Iterable[str | Passage]) -> str:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return await super().aanswer(question, documents)
+
+    async def astream_answer(self, question: str, documents: Iterable[str | Passage]) -> AsyncIterator[str]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        async for piece in super().astream_answer(question, documents):
+            yield piece
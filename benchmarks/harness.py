@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import gc
+import math
+import time
+from typing import Any, Callable
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted ``samples``."""
+    if not samples:
+        return math.nan
+    rank = max(1, math.ceil(fraction * len(samples)))
+    return samples[rank - 1]
+
+
+def summarize(samples: list[float], items: int | None = None) -> dict[str, Any]:
+    """Latency statistics in milliseconds; ``items`` is the work done across all samples."""
+    ordered = sorted(samples)
+    total = sum(ordered)
+    stats: dict[str, Any] = {
+        "iterations": len(ordered),
+        "total_s": round(total, 6),
+        "mean_ms": round(1000 * total / len(ordered), 4) if ordered else None,
+        "min_ms": round(1000 * ordered[0], 4) if ordered else None,
+        "p50_ms": round(1000 * percentile(ordered, 0.50), 4) if ordered else None,
+        "p95_ms": round(1000 * percentile(ordered, 0.95), 4) if ordered else None,
+        "p99_ms": round(1000 * percentile(ordered, 0.99), 4) if ordered else None,
+        "max_ms": round(1000 * ordered[-1], 4) if ordered else None,
+    }
+    work = items if items is not None else len(ordered)
+    stats["throughput_per_s"] = round(work / total, 2) if total else None
+    return stats
+
+
+def measure(fn: Callable[[int], Any], iterations: int, warmup: int = 0) -> dict[str, Any]:
+    """Time ``fn(i)`` for each iteration; warm-up calls are not recorded."""
+    for index in range(warmup):
+        fn(index)
+    samples: list[float] = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for index in range(iterations):
+            started = time.perf_counter()
+            fn(index)
+            samples.append(time.perf_counter() - started)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return summarize(samples)
+
+
+def measure_once(fn: Callable[[], Any], items: int = 1) -> dict[str, Any]:
+    """Time a single bulk operation that processes ``items`` units of work."""
+    started = time.perf_counter()
+    fn()
+    return summarize([time.perf_counter() - started], items=items)
@@ -0,0 +1,319 @@
+"""Run the offline benchmark suite and write the results as JSON.
+
+Everything runs against a throw-away working directory (SQLite database, Chroma
+store and synthetic vault), with deterministic fake embeddings and LLM, so no
+network access or API key is needed::
+
+    python -m benchmarks.run --notes 100000 --tasks 100000 --out before.json
+    python -m benchmarks.compare before.json after.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable
+
+from .harness import measure, measure_once, summarize
+
+SUITES = ("startup", "rag", "api", "scheduler", "export")
+REPO_ROOT = Path(__file__).resolve().parent.parent
+IMPORT_PROBE = """
+import time
+started = time.perf_counter()
+import assistant.app.main
+print(time.perf_counter() - started)
+"""
+# Prints once the app (lifespan included) has answered /notes.
+FIRST_RESPONSE_PROBE = """
+from fastapi.testclient import TestClient
+from assistant.app.main import app
+with TestClient(app) as client:
+    client.get("/notes/")
+    print("ready", flush=True)
+"""
+
+
+def _configure_environment(workdir: Path) -> None:
+    # Must run before anything under ``assistant.app`` is imported: the engine,
+    # Chroma path and vault path are read from the environment at import time.
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir / 'assistant.db'}"
+    os.environ["CHROMA_DB_PATH"] = str(workdir / "chroma")
+    os.environ["VAULT_PATH"] = str(workdir / "vault")
+    os.environ.pop("OPENAI_API_KEY", None)
+
+
+def _run_probe(code: str, env: dict[str, str] | None = None) -> tuple[float, str]:
+    """Run ``code`` in a fresh interpreter; return the seconds until its first output line, and the line."""
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", code],
+        cwd=REPO_ROOT,
+        env={**os.environ, **(env or {})},
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    line = process.stdout.readline() if process.stdout else ""
+    elapsed = time.perf_counter() - started
+    process.wait()
+    if not line:
+        raise RuntimeError(f"Start-up probe exited with status {process.returncode}")
+    return elapsed, line.strip()
+
+
+def bench_startup(args: argparse.Namespace, workdir: Path) -> dict[str, Any]:
+    # Fresh interpreters every time: start-up cost is what module caching hides in-process.
+    _run_probe(IMPORT_PROBE)  # compile bytecode once so runs are comparable
+    runs = range(args.startup_runs)
+    imports = [float(_run_probe(IMPORT_PROBE)[1]) for _ in runs]
+    results: dict[str, Any] = {"startup.import_main": summarize(imports)}
+    budget_ms = 1000 * args.import_budget
+    results["startup.import_main"]["budget_ms"] = budget_ms
+    results["startup.import_main"]["within_budget"] = results["startup.import_main"]["p50_ms"] <= budget_ms
+    results["startup.first_response"] = summarize([_run_probe(FIRST_RESPONSE_PROBE)[0] for _ in runs])
+    results["startup.first_response_no_rag"] = summarize(
+        [_run_probe(FIRST_RESPONSE_PROBE, {"RAG_ENABLED": "false"})[0] for _ in runs]
+    )
+    return results
+
+
+def bench_rag(args: argparse.Namespace, workdir: Path) -> dict[str, Any]:
+    from assistant.app.services.rag import SEARCH_MODES, RAGService
+
+    from .data import sentence, write_vault
+    from .fakes import FakeEmbeddingFunction, FakeLLM
+
+    results: dict[str, Any] = {}
+    vault = workdir / "vault"
+    write_vault(vault, args.vault_files, args.words_per_file, args.pdf_pages)
+    rag = RAGService(vault_path=vault, llm=FakeLLM(args.llm_latency), embedding_function=FakeEmbeddingFunction())
+
+    reports = []
+    results["rag.index.cold"] = measure_once(lambda: reports.append(rag.sync()), items=args.vault_files)
+    results["rag.index.cold"]["report"] = reports[-1].as_dict()
+    results["rag.index.noop"] = measure(lambda _: rag.sync(), iterations=5)
+
+    changed = sorted(vault.glob("*.md"))[: max(1, args.vault_files // 10)]
+    for path in changed:
+        path.write_text(path.read_text(encoding="utf-8") + "\n\nAppended during the benchmark.", encoding="utf-8")
+    results["rag.index.incremental"] = measure_once(rag.sync, items=len(changed))
+
+    rng = random.Random(11)
+    questions = [sentence(rng, 6) for _ in range(args.questions)]
+    for mode in SEARCH_MODES:
+        results[f"rag.retrieve.{mode}"] = measure(
+            lambda i, mode=mode: rag.retrieve(questions[i % len(questions)], mode=mode),
+            iterations=args.iterations,
+            warmup=3,
+        )
+
+    def uncached(i: int) -> None:
+        rag.answer_cache.clear()
+        rag.query(questions[i % len(questions)])
+
+    results["rag.query.uncached"] = measure(uncached, iterations=args.iterations, warmup=3)
+    results["rag.query.cached"] = measure(
+        lambda i: rag.query(questions[i % len(questions)]), iterations=args.iterations, warmup=len(questions)
+    )
+    return results
+
+
+def _ensure_seeded(args: argparse.Namespace) -> None:
+    from sqlmodel import Session, func, select
+
+    from assistant.app.deps import engine, init_db
+    from assistant.app.models import Note
+
+    from .data import seed_database
+
+    init_db()
+    with Session(engine) as session:
+        if session.exec(select(func.count()).select_from(Note)).one():
+            return
+    started = time.perf_counter()
+    seed_database(engine, args.notes, args.tasks)
+    print(f"Seeded {args.notes} notes and {args.tasks} tasks in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+
+def bench_api(args: argparse.Namespace, workdir: Path) -> dict[str, Any]:
+    from fastapi.testclient import TestClient
+
+    from assistant.app.main import app
+    from assistant.app.services.briefing import invalidate_briefing
+
+    _ensure_seeded(args)
+    # No ``with``: the lifespan (scheduler, indexers) stays off so only the routes are timed.
+    client = TestClient(app)
+    results: dict[str, Any] = {}
+
+    def get(url: str, **kwargs: Any) -> Callable[[int], Any]:
+        def call(_: int) -> Any:
+            response = client.get(url, **kwargs)
+            if response.status_code >= 400:
+                raise RuntimeError(f"GET {url} returned {response.status_code}")
+            return response
+
+        return call
+
+    def cold_briefing(i: int) -> None:
+        invalidate_briefing()
+        get("/briefing/today")(i)
+
+    results["api.briefing.cold"] = measure(cold_briefing, iterations=args.iterations, warmup=2)
+    results["api.briefing.warm"] = measure(get("/briefing/today"), iterations=args.iterations, warmup=2)
+    etag = client.get("/briefing/today").headers.get("etag", "")
+    results["api.briefing.not_modified"] = measure(
+        get("/briefing/today", headers={"If-None-Match": etag}), iterations=args.iterations, warmup=2
+    )
+    results["api.tasks.list"] = measure(get("/tasks/?limit=100"), iterations=args.iterations, warmup=2)
+    results["api.tasks.list_projected"] = measure(
+        get("/tasks/?limit=100&fields=id,title,due_date,priority"), iterations=args.iterations, warmup=2
+    )
+
+    cursor: dict[str, str | None] = {"value": None}
+
+    def next_notes_page(_: int) -> None:
+        params = {"limit": 100, "cursor": cursor["value"]} if cursor["value"] else {"limit": 100}
+        response = client.get("/notes/", params=params)
+        cursor["value"] = response.headers.get("x-next-cursor")
+
+    results["api.notes.page_walk"] = measure(next_notes_page, iterations=args.iterations)
+    results["api.sync.full_page"] = measure(get("/sync/?limit=500"), iterations=max(5, args.iterations // 10))
+    return results
+
+
+def bench_scheduler(args: argparse.Namespace, workdir: Path) -> dict[str, Any]:
+    from apscheduler.jobstores.memory import MemoryJobStore
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from sqlmodel import Session, select
+
+    from assistant.app.deps import engine
+    from assistant.app.models import Task
+    from assistant.app.services.scheduler import SchedulerService
+
+    _ensure_seeded(args)
+    scheduler = BackgroundScheduler(jobstores={"default": MemoryJobStore(), "memory": MemoryJobStore()})
+    scheduler.start(paused=True)
+    service = SchedulerService(scheduler)
+    results: dict[str, Any] = {}
+    try:
+        with Session(engine) as session:
+            tasks = session.exec(
+                select(Task).where(Task.completed == False).limit(args.schedule_tasks)  # noqa: E712
+            ).all()
+        results["scheduler.sync_task"] = measure(lambda i: service.sync_task(tasks[i]), iterations=len(tasks))
+        results["scheduler.sync_task"]["jobs"] = len(scheduler.get_jobs())
+        scheduler.remove_all_jobs()
+        jobs: list[int] = []
+        results["scheduler.rehydrate"] = measure_once(lambda: jobs.append(service.rehydrate()), items=args.tasks)
+        results["scheduler.rehydrate"]["jobs"] = jobs[-1]
+    finally:
+        scheduler.shutdown(wait=False)
+    return results
+
+
+def bench_export(args: argparse.Namespace, workdir: Path) -> dict[str, Any]:
+    from assistant.app import cli
+
+    _ensure_seeded(args)
+    rows = args.notes + args.tasks
+    results: dict[str, Any] = {}
+    for name, target, format, compress in (
+        ("export.json", workdir / "export.json", "json", False),
+        ("export.jsonl", workdir / "export.jsonl", "jsonl", False),
+        ("export.jsonl_gzip", workdir / "export.jsonl.gz", "jsonl", True),
+    ):
+        results[name] = measure_once(
+            lambda target=target, format=format, compress=compress: cli.export(target, format, compress, None),
+            items=rows,
+        )
+        results[name]["bytes"] = target.stat().st_size
+    return results
+
+
+BENCHMARKS: dict[str, Callable[[argparse.Namespace, Path], dict[str, Any]]] = {
+    "startup": bench_startup,
+    "rag": bench_rag,
+    "api": bench_api,
+    "scheduler": bench_scheduler,
+    "export": bench_export,
+}
+
+
+def _git_revision() -> str | None:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return output.stdout.strip() or None
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suite", action="append", choices=SUITES, help="Suites to run (default: all)")
+    parser.add_argument("--out", type=Path, default=Path("bench-results.json"))
+    parser.add_argument("--workdir", type=Path, help="Keep generated data here instead of a temp dir")
+    parser.add_argument("--notes", type=int, default=10_000)
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--vault-files", type=int, default=60)
+    parser.add_argument("--words-per-file", type=int, default=600)
+    parser.add_argument("--pdf-pages", type=int, default=4)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--schedule-tasks", type=int, default=5_000)
+    parser.add_argument("--startup-runs", type=int, default=5)
+    parser.add_argument(
+        "--import-budget", type=float, default=1.5, help="Seconds the p50 import of the app may take (exit 1 if over)"
+    )
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Seconds the fake LLM waits per answer")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="assistant-bench-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    _configure_environment(workdir)
+    results: dict[str, Any] = {}
+    try:
+        for suite in args.suite or SUITES:
+            started = time.perf_counter()
+            results.update(BENCHMARKS[suite](args, workdir))
+            print(f"{suite}: {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+    payload = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": {key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()},
+        },
+        "results": results,
+    }
+    args.out.write_text(json.dumps(payload, indent=2))
+    print(f"Wrote {len(results)} results to {args.out}", file=sys.stderr)
+    over_budget = [name for name, result in results.items() if result.get("within_budget") is False]
+    if over_budget:
+        print(f"Over budget: {', '.join(over_budget)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
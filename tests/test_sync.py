@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+os.environ.setdefault("RAG_ENABLED", "false")
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from assistant.app.deps import engine, init_db
+from assistant.app.models import Note, Tombstone
+from assistant.app.routers import sync as sync_router
+from assistant.app.services import sync
+from assistant.app.utils.pagination import encode_cursor, keyset_after, order_clauses
+
+EARLIER = datetime(2024, 1, 1, 12, 0)
+
+
+@pytest.fixture(autouse=True)
+def session(monkeypatch):
+    monkeypatch.setattr(sync, "SYNC_SETTLE_SECONDS", 0)
+    init_db()
+    with Session(engine) as session:
+        for model in (Note, Tombstone):
+            session.exec(delete(model))
+        session.commit()
+        yield session
+
+
+def add_notes(session: Session, stamps: list[datetime | None]) -> list[int]:
+    notes = [Note(title=f"note {index}", content="body", updated_at=stamp) for index, stamp in enumerate(stamps)]
+    session.add_all(notes)
+    session.commit()
+    return [note.id for note in notes]
+
+
+def sync_all(session: Session, cursor: str | None, limit: int) -> tuple[list[int], list[int], str]:
+    """Follow ``has_more`` to the end; returns note ids, deleted note ids and the final cursor."""
+    notes: list[int] = []
+    deleted: list[int] = []
+    while True:
+        page = sync.changes_since(session, cursor, limit)
+        notes += [note["id"] for note in page["notes"]]
+        deleted += [item["id"] for item in page["deleted"] if item["kind"] == "note"]
+        cursor = page["cursor"]
+        if not page["has_more"]:
+            return notes, deleted, cursor
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_keyset_after_pages_through_null_sort_keys(session, descending):
+    add_notes(session, [None, EARLIER, None, EARLIER + timedelta(hours=1), EARLIER])
+    ordering = [(Note.updated_at, descending), (Note.id, descending)]
+    expected = session.exec(select(Note.id).order_by(*order_clauses(ordering))).all()
+    seen: list[int] = []
+    position = None
+    while True:
+        statement = select(Note.updated_at, Note.id).order_by(*order_clauses(ordering)).limit(2)
+        if position is not None:
+            statement = statement.where(keyset_after(ordering, position))
+        rows = session.exec(statement).all()
+        if not rows:
+            break
+        seen += [row[1] for row in rows]
+        position = list(rows[-1])
+    assert seen == expected
+    assert len(seen) == 5
+
+
+def test_changes_since_pages_through_updated_at_ties(session):
+    ids = add_notes(session, [EARLIER] * 5)
+    notes, _, _ = sync_all(session, None, limit=2)
+    assert notes == ids
+
+
+def test_changes_since_reports_deletes_between_pages(session):
+    ids = add_notes(session, [EARLIER + timedelta(minutes=index) for index in range(4)])
+    first = sync.changes_since(session, None, 2)
+    assert [note["id"] for note in first["notes"]] == ids[:2]
+    assert first["has_more"]
+
+    for note_id in (ids[0], ids[3]):
+        session.delete(session.get(Note, note_id))
+        sync.record_deletion(session, "note", note_id)
+    session.commit()
+
+    notes, deleted, _ = sync_all(session, first["cursor"], limit=2)
+    assert notes == [ids[2]]
+    assert sorted(deleted) == [ids[0], ids[3]]
+
+
+def test_changes_since_resumes_after_later_edits(session):
+    ids = add_notes(session, [EARLIER, EARLIER])
+    _, _, cursor = sync_all(session, None, limit=10)
+    note = session.get(Note, ids[0])
+    note.content = "edited"
+    session.add(note)
+    session.commit()
+    notes, _, _ = sync_all(session, cursor, limit=10)
+    assert notes == [ids[0]]
+
+
+def test_changes_since_returns_rows_committed_late_behind_a_cursor(session, monkeypatch):
+    """A write stamped before a cursor was issued, but committed after it, still syncs."""
+    now = datetime(2024, 6, 1, 12, 0)
+
+    class Clock(datetime):
+        @classmethod
+        def utcnow(cls) -> datetime:
+            return now
+
+    monkeypatch.setattr(sync, "datetime", Clock)
+    monkeypatch.setattr(sync, "SYNC_SETTLE_SECONDS", sync.WRITE_LOCK_WAIT_SECONDS + 2)
+    # Stamped, then held up on the write lock for the whole busy timeout; the
+    # cursor below is handed out just before it commits.
+    late = Note(title="late", content="body", updated_at=now - timedelta(seconds=sync.WRITE_LOCK_WAIT_SECONDS))
+    # The idle notes stream moves its position up to the horizon.
+    notes, _, cursor = sync_all(session, None, limit=10)
+    assert notes == []
+
+    session.add(late)
+    session.commit()
+    now += timedelta(seconds=sync.SYNC_SETTLE_SECONDS)
+    assert sync_all(session, cursor, limit=10)[0] == [late.id]
+
+
+def test_settle_window_must_outlast_lock_waits(monkeypatch):
+    monkeypatch.setattr(sync, "WRITE_LOCK_WAIT_SECONDS", 5.0)
+    monkeypatch.setattr(sync, "SYNC_SETTLE_SECONDS", 5.0)
+    with pytest.raises(RuntimeError):
+        sync.check_settle_window()
+    monkeypatch.setattr(sync, "SYNC_SETTLE_SECONDS", 7.0)
+    sync.check_settle_window()
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+    app.include_router(sync_router.router)
+    return TestClient(app)
+
+
+def test_expired_cursor_is_gone(client):
+    expired = datetime.utcnow() - timedelta(days=sync.TOMBSTONE_RETENTION_DAYS + 1)
+    response = client.get("/sync/", params={"cursor": encode_cursor([None, None, None, None, expired, 0])})
+    assert response.status_code == 410
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor",
+        encode_cursor([1, 2]),
+        encode_cursor([1, 2, 3, 4, 5, 6]),
+        encode_cursor(["yesterday", 1, None, None, None, None]),
+        encode_cursor([None, {"id": 1}, None, None, None, None]),
+    ],
+)
+def test_malformed_cursor_is_rejected(client, cursor):
+    response = client.get("/sync/", params={"cursor": cursor})
+    assert response.status_code == 400